@@ -145,11 +145,17 @@ def make_initial_population(N):
     return population
 
 
-def simulate(n, k, total_number_of_new_comers_daily):
-    """simulate n agents for k time steps"""
+def simulate(n, k, total_number_of_new_comers_daily, exit_log=None):
+    """simulate n agents for k time steps
+
+    DISMISSED is absorbing, so dismissed agents leave the population and are
+    only counted. Pass a list as exit_log to have a (day, previous state) tuple
+    appended for every dismissal, as in the vectorized and cohort engines.
+    """
     population = make_initial_population(n)
     # print("Initial Population:", population)
     state_pop_tracker = []
+    num_dismissed = 0
     for i in range(k):
         # add number of people being investigated assuming people come in evenly per day
         population += [
@@ -157,13 +163,23 @@ def simulate(n, k, total_number_of_new_comers_daily):
             for i in range(total_number_of_new_comers_daily)
         ]
         spread_of_agents_among_states = {state: 0 for state in agent_states}
+        live_population = []
         for agent in population:
             agent.days_left_in_current_state -= 1
             if agent.days_left_in_current_state == 0:
+                previous_state = agent.current_agent_state
                 agent.current_agent_state = agent.next_agent_state
+                if agent.current_agent_state == DISMISSED:
+                    num_dismissed += 1
+                    if exit_log is not None:
+                        exit_log.append((i, previous_state))
+                    continue
                 agent.set_days_to_spend_in_current_state()
                 agent.set_next_agent_state()
             spread_of_agents_among_states[agent.current_agent_state] += 1
+            live_population.append(agent)
+        population = live_population
+        spread_of_agents_among_states[DISMISSED] = num_dismissed
         state_pop_tracker.append(spread_of_agents_among_states)
         # population += [Agent(agent_id=i, initial_agent_state=UNDER_INVESTIGATION) for i in range(total_number_of_new_comers_daily)]
     return population, state_pop_tracker
@@ -0,0 +1,135 @@
+"""Timing and equivalence checks for the hmt_hack ABM engines.
+
+Run from this directory, e.g. ``python benchmarks.py equivalence``.
+"""
+
+import argparse
+import random
+import time
+
+import abm
+import cohorts
+import numpy as np
+import pandas as pd
+import vectorized
+
+
+def daily_intake(n):
+    """New cases per day for n existing cases, as in the abm.py script."""
+    return round(((6657518 / 487708) * n) / 365)
+
+
+def bench_equivalence(n=2000, k=365, agent_replications=10, replications=30, seed=0):
+    """Agent simulate() against vectorized replications of the same scenario.
+
+    Each replication is reduced to its daily count per state averaged over
+    the k days, and the two engines are compared per state with Welch's
+    t-test.
+    """
+    from scipy import stats
+
+    random.seed(seed)
+    np.random.seed(seed)
+    start = time.perf_counter()
+    agents = np.array(
+        [
+            pd.DataFrame(abm.simulate(n, k, daily_intake(n))[1])[vectorized.states]
+            .mean()
+            .values
+            for _ in range(agent_replications)
+        ]
+    )
+    elapsed = time.perf_counter() - start
+    print(f"    agents: {elapsed / agent_replications:.3f} s per replication")
+
+    start = time.perf_counter()
+    arrays = np.array(
+        [
+            pd.DataFrame(vectorized.simulate_vectorized(n, k, daily_intake(n), s)[1])[
+                vectorized.states
+            ]
+            .mean()
+            .values
+            for s in np.random.SeedSequence(seed).spawn(replications)
+        ]
+    )
+    elapsed = time.perf_counter() - start
+    print(f"vectorized: {elapsed / replications:.3f} s per replication")
+    test = stats.ttest_ind(agents, arrays, equal_var=False)
+    for i, state in enumerate(vectorized.states):
+        print(
+            f"{state:>20}: mean count {agents[:, i].mean():9.1f} vs "
+            f"{arrays[:, i].mean():9.1f}, p={test.pvalue[i]:.2f}"
+        )
+
+
+def bench_scale(num_agents=10**7, k=730, seed=0):
+    """Days per second of the vectorized engine at num_agents agents by day k."""
+    # Initial backlog n plus k days of intake at the script's ratio
+    n = round(num_agents / (1 + k * daily_intake(10**6) / 10**6))
+    start = time.perf_counter()
+    population, tracker = vectorized.simulate_vectorized(n, k, daily_intake(n), seed)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{population.counts.sum()} agents over {k} days in {elapsed:.1f} s "
+        f"({elapsed / k * 1e3:.1f} ms per day), {population.size} rows held "
+        f"at the end ({len(population.state)} allocated)"
+    )
+    print(pd.Series(tracker[-1]).to_string())
+
+
+def bench_cohorts(n=10000, k=730, replications=30, national_caseload=487708, seed=0):
+    """Cohort engine against the vectorized one, then at the national caseload.
+
+    Replications are compared as in bench_equivalence; the national scenario
+    times one run of each engine from the full backlog.
+    """
+    from scipy import stats
+
+    engines = {
+        "vectorized": vectorized.simulate_vectorized,
+        "cohorts": cohorts.simulate_cohorts,
+    }
+    seeds = np.random.SeedSequence(seed).spawn(2 * replications)
+    means = {}
+    for i, (name, simulate) in enumerate(engines.items()):
+        means[name] = np.array(
+            [
+                pd.DataFrame(simulate(n, k, daily_intake(n), s)[1])[vectorized.states]
+                .mean()
+                .values
+                for s in seeds[i * replications : (i + 1) * replications]
+            ]
+        )
+    test = stats.ttest_ind(*means.values(), equal_var=False)
+    for i, state in enumerate(vectorized.states):
+        print(
+            f"{state:>20}: mean count {means['vectorized'][:, i].mean():9.1f} vs "
+            f"{means['cohorts'][:, i].mean():9.1f}, p={test.pvalue[i]:.2f}"
+        )
+
+    daily = daily_intake(national_caseload)
+    for name, simulate in engines.items():
+        start = time.perf_counter()
+        population, _ = simulate(national_caseload, k, daily, seed)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>10}: {national_caseload} cases + {daily}/day over {k} days "
+            f"in {elapsed:.2f} s ({population.counts.sum()} cases by the end)"
+        )
+
+
+benchmarks = {
+    "equivalence": bench_equivalence,
+    "scale": bench_scale,
+    "cohorts": bench_cohorts,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(benchmarks)}")
+    args = parser.parse_args()
+    for name in args.names or benchmarks:
+        print(f"== {name} ==")
+        benchmarks[name]()
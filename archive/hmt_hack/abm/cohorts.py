@@ -0,0 +1,134 @@
+"""Count-based cohort engine for the hmt_hack ABM.
+
+Cases in abm.py differ only in their state and days left, so the population
+is held as a histogram counts[state, days_left] rather than one row per
+agent. Each day the histogram shifts one column towards zero; the cases
+reaching zero leave their state together, split over next states by one
+multinomial draw per state from the transition table in vectorized.py, and
+the cases entering each state are spread over its stay lengths by a
+multinomial on the distribution of draw_number_of_days. The daily cost
+depends on the number of states and the longest stay, not on the number of
+cases, so the national caseload runs as fast as a 10000 case sample.
+
+Stays are cut off at max_days (mean + 10 sd of the longest state), with the
+tail folded into the last column. DISMISSED is absorbing and only counted.
+"""
+
+from math import erf, sqrt
+
+import numpy as np
+from abm import UNDER_INVESTIGATION
+from vectorized import (
+    DISMISSED_CODE,
+    codes,
+    initial_counts,
+    mean_days,
+    states,
+    transitions,
+)
+
+live = np.arange(len(states)) != DISMISSED_CODE
+max_days = int(np.ceil(mean_days[live].max() * (1 + 10 / 3)))
+
+
+def days_distribution(mean, max_days=max_days):
+    """P(draw_number_of_days(mean) = d) for d = 0..max_days.
+
+    The draw is max(1, round(normal(mean, mean / 3))), so d = 1 also takes
+    everything below 1.5 and d = max_days everything above max_days - 0.5.
+    """
+    edges = np.arange(max_days) + 0.5
+    cdf = np.array([0.5 * (1 + erf((x - mean) / (mean / 3 * sqrt(2)))) for x in edges])
+    probabilities = np.diff(cdf, prepend=0.0, append=1.0)
+    probabilities[1] += probabilities[0]
+    probabilities[0] = 0
+    return probabilities
+
+
+# stays[s, d] is the chance that a case entering state s stays d days;
+# DISMISSED never leaves, so its row is unused
+stays = np.zeros((len(states), max_days + 1))
+stays[live] = [days_distribution(mean) for mean in mean_days[live]]
+stays[DISMISSED_CODE, 1] = 1
+
+
+class CohortPopulation:
+    """Cases as counts per (state, days left), plus the dismissed total.
+
+    Has the add/step/spread interface of ArrayPopulation. With log_exits,
+    every dismissal is recorded for exit_log().
+    """
+
+    def __init__(self, rng=None, log_exits=False):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.histogram = np.zeros((len(states), max_days + 1), np.int64)
+        self.num_dismissed = 0
+        self.day = 0
+        self.log_exits = log_exits
+        self._exits = []
+
+    @property
+    def counts(self):
+        """Current number of cases in each state, indexed by state code."""
+        counts = self.histogram.sum(axis=1)
+        counts[DISMISSED_CODE] = self.num_dismissed
+        return counts
+
+    def add(self, state, number):
+        """Add number new cases in state, spread over freshly drawn stays."""
+        code = codes[state]
+        self.histogram[code] += self.rng.multinomial(number, stays[code])
+
+    def step(self):
+        """Advance every case by one day."""
+        leaving = self.histogram[:, 1].copy()
+        # Column 0 stays empty: cases reaching zero days left move on at once
+        self.histogram[:, 1:-1] = self.histogram[:, 2:]
+        self.histogram[:, -1] = 0
+
+        # moves[s, t] cases leave s for t; only live states ever have leavers
+        moves = self.rng.multinomial(leaving, transitions)
+        arriving = moves.sum(axis=0)
+        self.num_dismissed += arriving[DISMISSED_CODE]
+        self.histogram[live] += self.rng.multinomial(arriving[live], stays[live])
+        if self.log_exits:
+            self._exits.append((self.day, moves[:, DISMISSED_CODE]))
+        self.day += 1
+
+    def exit_log(self):
+        """Days and previous state codes of every dismissal, as two arrays."""
+        if not self._exits:
+            return np.empty(0, np.int16), np.empty(0, np.int8)
+        days = np.concatenate(
+            [np.full(exits.sum(), day, np.int16) for day, exits in self._exits]
+        )
+        previous = np.concatenate(
+            [
+                np.repeat(np.arange(len(states), dtype=np.int8), e)
+                for _, e in self._exits
+            ]
+        )
+        return days, previous
+
+    def spread(self):
+        """Current number of cases in each state, as in state_pop_tracker."""
+        return dict(zip(states, self.counts.tolist()))
+
+
+def simulate_cohorts(
+    n, k, total_number_of_new_comers_daily, seed=None, log_exits=False
+):
+    """Cohort simulate(): n starting cases, k days, a fixed daily intake.
+
+    Returns the final CohortPopulation and state_pop_tracker in the same
+    list-of-dicts format as simulate().
+    """
+    population = CohortPopulation(np.random.default_rng(seed), log_exits)
+    for state, number in initial_counts(n).items():
+        population.add(state, number)
+    state_pop_tracker = []
+    for _ in range(k):
+        population.add(UNDER_INVESTIGATION, total_number_of_new_comers_daily)
+        population.step()
+        state_pop_tracker.append(population.spread())
+    return population, state_pop_tracker
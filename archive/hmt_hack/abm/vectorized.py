@@ -0,0 +1,196 @@
+"""Array-backed engine for the hmt_hack ABM.
+
+Agents are rows of two arrays, an int8 state code and an int16 count of days
+left in that state. Each day all counters are decremented at once and the agents whose
+time is up move on together: their next states are drawn from the same
+transition table as Agent.set_next_agent_state and their stays from the same
+rounded normal as draw_number_of_days. An agent's next state is drawn when it
+leaves a state rather than when it enters it, which gives the same
+distribution. The per-state counts are updated from the movers only.
+
+DISMISSED is absorbing, so dismissed agents are only counted: their rows are
+compacted out of the arrays once they make up half of them, which keeps the
+daily cost proportional to live cases. Exits can optionally be logged as
+(day, previous state code) pairs.
+"""
+
+import numpy as np
+from abm import (
+    CC_BACKLOG,
+    CHARGED,
+    CONVICTED,
+    DISMISSED,
+    IMPRISONED,
+    IN_CC,
+    IN_MC,
+    MC_BACKLOG,
+    UNDER_INVESTIGATION,
+    agent_states,
+    cc_to_conviction_prob,
+    investigation_to_charged_prob,
+    mc_to_cc_prob,
+    mc_to_conviction_prob,
+    mc_to_dismissal_prob,
+    mean_days_to_spend_in_state,
+)
+
+# agent_states lists CC_BACKLOG twice; codes index the distinct states
+states = list(dict.fromkeys(agent_states))
+codes = {state: code for code, state in enumerate(states)}
+
+# transitions[s, t] is the chance that a case leaving state s moves to t;
+# DISMISSED never changes, as in Agent.set_next_agent_state
+transitions = np.zeros((len(states), len(states)))
+for source, targets in {
+    UNDER_INVESTIGATION: {
+        CHARGED: investigation_to_charged_prob,
+        DISMISSED: 1 - investigation_to_charged_prob,
+    },
+    CHARGED: {MC_BACKLOG: 1.0},
+    MC_BACKLOG: {IN_MC: 1.0},
+    IN_MC: {
+        CC_BACKLOG: mc_to_cc_prob,
+        CONVICTED: mc_to_conviction_prob,
+        DISMISSED: mc_to_dismissal_prob,
+    },
+    CC_BACKLOG: {IN_CC: 1.0},
+    IN_CC: {CONVICTED: cc_to_conviction_prob, DISMISSED: 1 - cc_to_conviction_prob},
+    CONVICTED: {IMPRISONED: 1.0},
+    IMPRISONED: {DISMISSED: 1.0},
+    DISMISSED: {DISMISSED: 1.0},
+}.items():
+    for target, probability in targets.items():
+        transitions[codes[source], codes[target]] = probability
+cumulative_transitions = transitions.cumsum(axis=1)
+
+DISMISSED_CODE = codes[DISMISSED]
+
+mean_days = np.array([mean_days_to_spend_in_state[state] for state in states])
+
+
+def draw_days(rng, state_codes):
+    """Vectorized draw_number_of_days for an array of state codes.
+
+    Draws are capped at the int16 maximum, which only DISMISSED (mean 999999)
+    would reach; dismissed agents leave the arrays without a draw.
+    """
+    mean = mean_days[state_codes]
+    days = np.rint(rng.normal(mean, mean / 3))
+    return np.clip(days, 1, np.iinfo(np.int16).max).astype(np.int16)
+
+
+def draw_next_states(rng, state_codes):
+    """Next state codes for cases leaving the given states."""
+    u = rng.random(len(state_codes))
+    # Count the cumulative probabilities below u, capped at the last state
+    # in case rounding leaves a row summing to just under 1
+    next_codes = (u[:, None] > cumulative_transitions[state_codes]).sum(axis=1)
+    return np.minimum(next_codes, len(states) - 1).astype(np.int8)
+
+
+class ArrayPopulation:
+    """Agents as state and days-left arrays, plus per-state counts.
+
+    The arrays hold the live agents and any dismissed rows not yet compacted
+    away, and double in capacity when arrivals outgrow them. With
+    log_exits, every dismissal is recorded for exit_log().
+    """
+
+    def __init__(self, capacity, rng=None, log_exits=False):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.state = np.empty(capacity, np.int8)
+        self.days_left = np.empty(capacity, np.int16)
+        self.size = 0
+        self.num_dismissed_rows = 0
+        self.counts = np.zeros(len(states), np.int64)
+        self.day = 0
+        self.log_exits = log_exits
+        self._exits = []
+
+    def add(self, state, number):
+        """Add number new agents in state, each with a freshly drawn stay."""
+        code = codes[state]
+        if self.size + number > len(self.state):
+            capacity = max(2 * len(self.state), self.size + number)
+            self.state = np.resize(self.state, capacity)
+            self.days_left = np.resize(self.days_left, capacity)
+        new = slice(self.size, self.size + number)
+        self.state[new] = code
+        self.days_left[new] = draw_days(self.rng, np.full(number, code))
+        self.size += number
+        self.counts[code] += number
+
+    def step(self):
+        """Advance every agent by one day."""
+        days_left = self.days_left[: self.size]
+        days_left -= 1
+        moving = np.flatnonzero(days_left == 0)
+        old = self.state[moving]
+        new = draw_next_states(self.rng, old)
+        self.state[moving] = new
+        self.counts -= np.bincount(old, minlength=len(states))
+        self.counts += np.bincount(new, minlength=len(states))
+
+        dismissed = new == DISMISSED_CODE
+        staying = moving[~dismissed]
+        days_left[staying] = draw_days(self.rng, new[~dismissed])
+        # Dismissed rows count down from far away until they are compacted
+        days_left[moving[dismissed]] = np.iinfo(np.int16).max
+        self.num_dismissed_rows += np.count_nonzero(dismissed)
+        if self.log_exits:
+            self._exits.append((self.day, old[dismissed]))
+        if 2 * self.num_dismissed_rows > self.size:
+            self.compact()
+        self.day += 1
+
+    def compact(self):
+        """Drop the dismissed rows, keeping the live agents in order."""
+        live = np.flatnonzero(self.state[: self.size] != DISMISSED_CODE)
+        self.size = len(live)
+        self.state[: self.size] = self.state[live]
+        self.days_left[: self.size] = self.days_left[live]
+        self.num_dismissed_rows = 0
+
+    def exit_log(self):
+        """Days and previous state codes of every dismissal, as two arrays."""
+        if not self._exits:
+            return np.empty(0, np.int16), np.empty(0, np.int8)
+        days = np.concatenate(
+            [np.full(len(previous), day, np.int16) for day, previous in self._exits]
+        )
+        return days, np.concatenate([previous for _, previous in self._exits])
+
+    def spread(self):
+        """Current number of agents in each state, as in state_pop_tracker."""
+        return dict(zip(states, self.counts.tolist()))
+
+
+def initial_counts(N):
+    """Backlog split of make_initial_population(N), as {state: count}."""
+    backlog = {MC_BACKLOG: 337632, CC_BACKLOG: 62207, IMPRISONED: 87869}
+    total = sum(backlog.values())
+    return {state: round(count / total * N) for state, count in backlog.items()}
+
+
+def simulate_vectorized(
+    n, k, total_number_of_new_comers_daily, seed=None, log_exits=False
+):
+    """Vectorized simulate(): n starting agents, k days, a fixed daily intake.
+
+    Returns the final ArrayPopulation and state_pop_tracker in the same
+    list-of-dicts format as simulate().
+    """
+    start = initial_counts(n)
+    population = ArrayPopulation(
+        sum(start.values()) + total_number_of_new_comers_daily,
+        np.random.default_rng(seed),
+        log_exits,
+    )
+    for state, number in start.items():
+        population.add(state, number)
+    state_pop_tracker = []
+    for _ in range(k):
+        population.add(UNDER_INVESTIGATION, total_number_of_new_comers_daily)
+        population.step()
+        state_pop_tracker.append(population.spread())
+    return population, state_pop_tracker
@@ -0,0 +1,125 @@
+"""Struct-of-arrays engine for the justice system ABM.
+
+Same rules as mesa_simulation.JusticeSystemModel(retire_resolved=False):
+resolved cases keep having their end time moved on and prisoners move on to
+D. The cases are rows of NumPy arrays (state code, start and end time) rather
+than Agent objects, and each tick advances every case with a handful of
+vectorized operations.
+"""
+
+import numpy as np
+import pandas as pd
+from mesa_simulation import (
+    PRISON_CAPACITY,
+    processing_times,
+    states,
+    transition_probabilities,
+)
+
+# State codes are indices into states
+PRISON, DISMISSED = states.index("P"), states.index("D")
+
+
+class ArrayDataCollector:
+    """Per-step snapshots with the DataCollector dataframe layouts."""
+
+    def __init__(self):
+        self.steps = []
+        self.prison_population = []
+        self.state = []
+        self.end_time = []
+
+    def collect(self, model):
+        self.steps.append(model.steps)
+        self.prison_population.append(model.prison_population)
+        self.state.append(model.state.copy())
+        self.end_time.append(model.end_time.copy())
+
+    def get_model_vars_dataframe(self):
+        return pd.DataFrame({"Prison Population": self.prison_population})
+
+    def get_agent_vars_dataframe(self):
+        num_cases = len(self.state[0]) if self.state else 0
+        index = pd.MultiIndex.from_product(
+            [self.steps, np.arange(1, num_cases + 1)], names=["Step", "AgentID"]
+        )
+        return pd.DataFrame(
+            {
+                "State": pd.Categorical.from_codes(
+                    np.concatenate(self.state or [np.empty(0, np.int8)]),
+                    categories=states,
+                ),
+                "Start Time": np.zeros(len(index), np.int64),
+                "End Time": np.concatenate(self.end_time or [np.empty(0)]),
+            },
+            index=index,
+        )
+
+
+class ArrayJusticeSystemModel:
+    """Array-backed JusticeSystemModel: one row per case, one tick per step."""
+
+    def __init__(
+        self,
+        num_cases=100,
+        max_steps=500,
+        prison_capacity=PRISON_CAPACITY,
+        transition_probabilities=transition_probabilities,
+        processing_times=processing_times,
+        seed=42,
+    ):
+        self.num_cases = num_cases
+        self.max_steps = max_steps
+        self.prison_capacity = prison_capacity
+        self.prison_population = 0
+        self.rng = np.random.default_rng(seed)
+        self.time = 0
+        self.steps = 0
+
+        self.state = np.zeros(num_cases, np.int8)
+        self.end_time = np.full(num_cases, np.nan)
+
+        # Per-state parameters looked up by state code
+        self.mean = np.array([processing_times[s][0] for s in states[:-1]])
+        self.sd = np.array([processing_times[s][1] for s in states[:-1]])
+        self.proceed = np.array([transition_probabilities[s] for s in states[:-1]])
+
+        self.datacollector = ArrayDataCollector()
+
+    def step(self):
+        """Advance every case by one tick."""
+        state, now = self.state, self.time
+        active = np.flatnonzero(state < DISMISSED)
+        codes = state[active]
+        # Cases already done only have their end time moved on, as in Case.step
+        self.end_time[state == DISMISSED] = now
+
+        dismissed = self.rng.random(len(active)) > self.proceed[codes]
+        out = active[dismissed]
+        time_spent = self.rng.normal(
+            self.mean[codes[dismissed]], self.sd[codes[dismissed]]
+        )
+        state[out] = DISMISSED
+        self.end_time[out] = now + np.maximum(1, time_spent)
+
+        moved = active[~dismissed]
+        state[moved] += 1
+        # Cases reaching prison take the free places in random activation
+        # order; the rest are turned away
+        arriving = self.rng.permutation(moved[state[moved] == PRISON])
+        free = max(0, self.prison_capacity - self.prison_population)
+        admitted = min(len(arriving), free)
+        self.prison_population += admitted
+        state[arriving[admitted:]] = DISMISSED
+        self.end_time[moved[state[moved] >= PRISON]] = now
+
+        self.time += 1
+        self.steps += 1
+        self.datacollector.collect(self)
+
+    def run_model(self):
+        """Run the simulation until max_steps is reached or all cases are completed."""
+        for _ in range(self.max_steps):
+            self.step()
+            if np.all(self.state >= PRISON):
+                break  # Stop simulation if all cases are resolved
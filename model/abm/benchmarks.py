@@ -0,0 +1,158 @@
+"""Timing and equivalence checks for the ABM.
+
+Run from this directory, e.g. ``python benchmarks.py array_model``.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+import array_model
+import mesa_simulation
+import pandas as pd
+
+
+def _state_shares(model):
+    """Share of cases in each state at every step, plus prison population."""
+    agents = model.datacollector.get_agent_vars_dataframe()
+    shares = (
+        agents.groupby(level="Step")["State"]
+        .value_counts(normalize=True)
+        .unstack(fill_value=0.0)
+        .reindex(columns=array_model.states, fill_value=0.0)
+    )
+    prison = model.datacollector.get_model_vars_dataframe()["Prison Population"]
+    return shares.assign(prison_population=prison.values)
+
+
+def bench_array_model(num_cases=1000000):
+    """Mesa agents against the struct-of-arrays engine at num_cases cases."""
+    results = {}
+    # The array engine keeps resolved cases in place, like Mesa without retirement
+    for name, make_model in [
+        (
+            "mesa",
+            lambda: mesa_simulation.JusticeSystemModel(
+                num_cases, retire_resolved=False
+            ),
+        ),
+        ("arrays", lambda: array_model.ArrayJusticeSystemModel(num_cases)),
+    ]:
+        start = time.perf_counter()
+        model = make_model()
+        model.run_model()
+        elapsed = time.perf_counter() - start
+        results[name] = _state_shares(model)
+        print(f"{name:>6}: {elapsed:6.1f} s ({num_cases / elapsed:.0f} cases/s)")
+    difference = (results["mesa"] - results["arrays"]).abs()
+    print("largest difference in state share at any step:", end=" ")
+    print(f"{difference.drop(columns='prison_population').max().max():.4f}")
+    print(pd.concat(results, axis=1).round(4).to_string())
+
+
+def bench_collection(num_cases=100000, arrival_rate=20, max_steps=500):
+    """Peak memory and collected data of the agents and events collect modes.
+
+    Neither mode retires resolved cases, so only the collection differs. A
+    batch of num_cases resolves within a few steps; with arrival_rate new
+    cases a step the run lasts max_steps, and the agent table grows with
+    every case started times every step.
+    """
+    scenarios = {
+        "batch": dict(num_cases=num_cases),
+        "arrivals": dict(num_cases=0, arrival_rate=arrival_rate),
+    }
+    for scenario, kwargs in scenarios.items():
+        print(scenario)
+        for collect in ["agents", "events"]:
+            gc.collect()
+            tracemalloc.start()
+            start = time.perf_counter()
+            model = mesa_simulation.JusticeSystemModel(
+                max_steps=max_steps, collect=collect, retire_resolved=False, **kwargs
+            )
+            model.run_model()
+            if collect == "agents":
+                collected = model.datacollector.get_agent_vars_dataframe()
+            else:
+                collected = model.events_frame()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"  {collect:>6}: {elapsed:5.1f} s, peak {peak / 2**20:6.1f} MiB, "
+                f"{len(collected)} rows over {model.steps} steps"
+            )
+    counts = model.datacollector.get_model_vars_dataframe().iloc[-1]
+    snapshot = model.agent_snapshot()["State"].value_counts()
+    consistent = all(
+        counts[state] == snapshot.get(state, 0) for state in snapshot.index
+    )
+    print(f"final state counts match an agent snapshot: {consistent}")
+
+
+def bench_retirement(num_cases=200000):
+    """Seconds per step with resolved cases kept in the schedule or retired."""
+    for retire_resolved in [False, True]:
+        model = mesa_simulation.JusticeSystemModel(
+            num_cases, collect="events", retire_resolved=retire_resolved
+        )
+        seconds = []
+        while model.unresolved and model.steps < model.max_steps:
+            start = time.perf_counter()
+            model.step()
+            seconds.append(time.perf_counter() - start)
+        del model
+        gc.collect()
+        label = "retired" if retire_resolved else "kept"
+        print(
+            f"{label:>8}: {sum(seconds):5.1f} s, per step "
+            + " ".join(f"{s:.2f}" for s in seconds)
+        )
+
+
+def bench_arrivals(arrival_rate=500, max_steps=300, report_every=100):
+    """Memory and step time under continuous arrivals, keeping vs pooling agents."""
+    for retire_resolved in [False, True]:
+        gc.collect()
+        tracemalloc.start()
+        model = mesa_simulation.JusticeSystemModel(
+            0,
+            max_steps,
+            collect="events",
+            retire_resolved=retire_resolved,
+            arrival_rate=arrival_rate,
+        )
+        print("pooled and retired" if retire_resolved else "kept in schedule")
+        start = time.perf_counter()
+        for _ in range(max_steps):
+            model.step()
+            if model.steps % report_every == 0:
+                elapsed = time.perf_counter() - start
+                current = tracemalloc.get_traced_memory()[0]
+                print(
+                    f"  step {model.steps:4d}: {model.unresolved:5d} active, "
+                    f"{len(model.schedule.agents):6d} scheduled, "
+                    f"{current / 2**20:6.1f} MiB, {elapsed:5.1f} s"
+                )
+                start = time.perf_counter()
+        tracemalloc.stop()
+        del model
+
+
+benchmarks = {
+    "array_model": bench_array_model,
+    "collection": bench_collection,
+    "retirement": bench_retirement,
+    "arrivals": bench_arrivals,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(benchmarks)}")
+    args = parser.parse_args()
+    for name in args.names or benchmarks:
+        print(f"== {name} ==")
+        benchmarks[name]()
@@ -1,3 +1,5 @@
+import itertools
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
@@ -34,38 +36,48 @@ transition_probabilities = {
     "P": 1.0,
 }
 
+# States a case moves through in order; D is dismissed (or done after prison)
+states = ["U", "C", "Mb", "M", "Cb", "Cc", "P", "D"]
+
 
 class Case(Agent):
     """An individual case moving through the justice system."""
 
     def __init__(self, model):
         super().__init__(model=model)
+        self.reset()
+
+    def reset(self):
+        """Start as a new case at the current time, also when recycled from the pool."""
+        self.unique_id = next(self.model.case_ids)
         self.state = "U"
-        self.start_time = model.schedule.time
+        self.start_time = self.model.schedule.time
         self.end_time = None
 
     def step(self):
         """Progress case through the justice system."""
-        if self.state in processing_times:
+        previous = self.state
+        model = self.model
+        if self.state in model.processing_times:
             # Simulate time spent in the current state
-            mean, std = processing_times[self.state]
-            time_spent = max(1, np.random.normal(mean, std))
+            mean, std = model.processing_times[self.state]
+            time_spent = max(1, model.rng.normal(mean, std))
 
             # Decide whether to proceed or be dismissed
-            if np.random.rand() > transition_probabilities[self.state]:
+            if model.rng.random() > model.transition_probabilities[self.state]:
                 self.state = "D"
                 self.end_time = self.model.schedule.time + time_spent
+                self.model.record_transition(self, previous)
                 return
 
             # Transition to the next stage
-            transitions = ["U", "C", "Mb", "M", "Cb", "Cc", "P", "D"]
-            next_state_index = transitions.index(self.state) + 1
-            if next_state_index < len(transitions):
-                self.state = transitions[next_state_index]
+            next_state_index = states.index(self.state) + 1
+            if next_state_index < len(states):
+                self.state = states[next_state_index]
 
             # If imprisoned, check prison capacity
             if self.state == "P":
-                if self.model.prison_population < PRISON_CAPACITY:
+                if self.model.prison_population < self.model.prison_capacity:
                     self.model.prison_population += 1
                 else:
                     self.state = "D"
@@ -73,19 +85,68 @@ class Case(Agent):
         # Record end time if case is completed or dismissed
         if self.state in ["P", "D"]:
             self.end_time = self.model.schedule.time
+        if self.state != previous:
+            self.model.record_transition(self, previous)
 
 
 class JusticeSystemModel(Model):
     """Agent-Based Model of the justice system."""
 
-    def __init__(self, num_cases=100, max_steps=500):
-        super().__init__()
+    def __init__(
+        self,
+        num_cases=100,
+        max_steps=500,
+        collect="agents",
+        retire_resolved=None,
+        prison_capacity=PRISON_CAPACITY,
+        transition_probabilities=transition_probabilities,
+        processing_times=processing_times,
+        arrival_rate=0,
+        seed=42,
+    ):
+        # All randomness (Case draws from self.rng, activation order from
+        # self.random) comes from seed, an int or np.random.SeedSequence, so
+        # independent models can run in parallel
+        super().__init__(rng=seed)
+        # "agents" records every agent on every step; "events" only counts
+        # states per step, logs each transition for events_frame() and
+        # builds agent records on demand in agent_snapshot()
+        if collect not in ("agents", "events"):
+            raise ValueError(f"Unknown collect mode {collect!r}")
         self.num_cases = num_cases
         self.max_steps = max_steps
+        self.collect = collect
+        self.prison_capacity = prison_capacity
+        self.transition_probabilities = transition_probabilities
+        self.processing_times = processing_times
+        # Mean of the Poisson number of new cases per step (or a function of
+        # the time returning it); with arrivals the run lasts max_steps
+        self.arrival_rate = arrival_rate
         self.prison_population = 0
+        # Kept up to date on every arrival and transition, so counting is
+        # O(1) per step
+        self.state_counts = dict.fromkeys(states, 0)
+        self.unresolved = 0
+        self.events = []
+        self.case_ids = itertools.count(1)
 
-        # ✅ FIX: Define a reproducible random number generator
-        self.rng = np.random.default_rng(seed=42)
+        # With retire_resolved, cases reaching P or D leave the schedule and
+        # are no longer stepped (end times stay at resolution, prisoners are
+        # not moved on to D). Their records go to these arrays, in the order
+        # they were resolved, grown by doubling when arrivals outrun them;
+        # with arrivals the retired Case objects are pooled for reuse.
+        # Cases retire before the collector runs, so the per-step agent table
+        # would never show P or D; by default only events mode retires
+        if retire_resolved is None:
+            retire_resolved = collect == "events"
+        self.retire_resolved = retire_resolved
+        self.num_retired = 0
+        size = max(num_cases, 1024)
+        self.retired_ids = np.empty(size, np.int64)
+        self.retired_states = np.empty(size, np.int8)
+        self.retired_start_times = np.empty(size)
+        self.retired_end_times = np.empty(size)
+        self.pool = []
 
         # ✅ FIX: Initialize `AgentSet` properly with an empty list
         # self.schedule = AgentSet(agents=[], random=self.rng)
@@ -93,21 +154,123 @@ class JusticeSystemModel(Model):
 
         # Create cases and add them to AgentSet
         for i in range(num_cases):
-            case = Case(model=self)
-            self.schedule.add(case)
+            self.add_case()
 
         # Data collection
-        self.datacollector = DataCollector(
-            model_reporters={"Prison Population": lambda m: m.prison_population},
-            agent_reporters={
-                "State": "state",
-                "Start Time": "start_time",
-                "End Time": "end_time",
-            },
+        model_reporters = {"Prison Population": lambda m: m.prison_population}
+        if collect == "agents":
+            self.datacollector = DataCollector(
+                model_reporters=model_reporters,
+                agent_reporters={
+                    "State": "state",
+                    "Start Time": "start_time",
+                    "End Time": "end_time",
+                },
+            )
+        else:
+            for state in states:
+                model_reporters[state] = lambda m, state=state: m.state_counts[state]
+            self.datacollector = DataCollector(model_reporters=model_reporters)
+
+    def add_case(self):
+        """Start a new case, recycling a pooled Case object if there is one."""
+        if self.pool:
+            case = self.pool.pop()
+            case.reset()
+            self.register_agent(case)
+        else:
+            case = Case(model=self)
+        self.schedule.add(case)
+        self.state_counts["U"] += 1
+        self.unresolved += 1
+
+    def record_transition(self, case, previous):
+        """Update the counters, log the change and retire the case if resolved."""
+        self.state_counts[previous] -= 1
+        self.state_counts[case.state] += 1
+        if self.collect == "events":
+            self.events.append(
+                (
+                    self.steps,
+                    case.unique_id,
+                    previous,
+                    case.state,
+                    self.schedule.time,
+                    case.end_time,
+                )
+            )
+        if previous not in ("P", "D") and case.state in ("P", "D"):
+            self.unresolved -= 1
+            if self.retire_resolved:
+                self.retire(case)
+
+    def retire(self, case):
+        """Move a resolved case's record to the result arrays and drop the agent."""
+        row = self.num_retired
+        if row == len(self.retired_ids):
+            for name in (
+                "retired_ids",
+                "retired_states",
+                "retired_start_times",
+                "retired_end_times",
+            ):
+                setattr(self, name, np.resize(getattr(self, name), 2 * row))
+        self.retired_ids[row] = case.unique_id
+        self.retired_states[row] = states.index(case.state)
+        self.retired_start_times[row] = case.start_time
+        self.retired_end_times[row] = case.end_time
+        self.num_retired += 1
+        # Stepping iterates over a copy of the schedule, so this is safe mid-step
+        self.schedule.remove(case)
+        case.remove()
+        if self.arrival_rate:
+            self.pool.append(case)
+
+    def events_frame(self):
+        """One row per state transition, in the order they happened."""
+        return pd.DataFrame(
+            self.events,
+            columns=["Step", "AgentID", "From", "To", "Time", "End Time"],
+        )
+
+    def agent_snapshot(self):
+        """Current State, Start Time and End Time of every case, retired or not."""
+        columns = ["AgentID", "State", "Start Time", "End Time"]
+        active = pd.DataFrame(
+            [
+                (agent.unique_id, agent.state, agent.start_time, agent.end_time)
+                for agent in self.schedule.agents
+            ],
+            columns=columns,
+        )
+        retired = pd.DataFrame(
+            dict(
+                zip(
+                    columns,
+                    [
+                        self.retired_ids[: self.num_retired],
+                        np.array(states)[self.retired_states[: self.num_retired]],
+                        self.retired_start_times[: self.num_retired],
+                        self.retired_end_times[: self.num_retired],
+                    ],
+                )
+            )
+        )
+        return (
+            pd.concat([retired, active], ignore_index=True)
+            .astype({"AgentID": np.int64, "Start Time": float, "End Time": float})
+            .set_index("AgentID")
+            .sort_index()
         )
 
     def step(self):
         """Advance simulation by one time step."""
+        if self.arrival_rate:
+            rate = self.arrival_rate
+            if callable(rate):
+                rate = rate(self.schedule.time)
+            for _ in range(self.rng.poisson(rate)):
+                self.add_case()
         self.schedule.step()
         self.datacollector.collect(self)
 
@@ -115,62 +278,62 @@ class JusticeSystemModel(Model):
         """Run the simulation until max_steps is reached or all cases are completed."""
         for _ in range(self.max_steps):
             self.step()
-            if all(agent.state in ["P", "D"] for agent in self.schedule.agents):
+            if not self.unresolved and not self.arrival_rate:
                 break  # Stop simulation if all cases are resolved
 
 
-# **Run the ABM simulation**
-justice_model = JusticeSystemModel(num_cases=100, max_steps=500)
-justice_model.run_model()
-
-# **Collect and analyze results**
-model_data = justice_model.datacollector.get_model_vars_dataframe()
-agent_data = justice_model.datacollector.get_agent_vars_dataframe()
-
-# Convert to Pandas DataFrame
-df_agents = agent_data.reset_index()
-print(df_agents.columns)
-# Compute total case duration
-df_agents["Total Duration"] = df_agents["End Time"] - df_agents["Start Time"]
-
-# Print summary statistics
-print("Summary Statistics:")
-print(df_agents[["Total Duration"]].describe())
-
-# **Plot Case Completion Times**
-plt.figure(figsize=(10, 5))
-plt.hist(
-    df_agents["Total Duration"].dropna(),
-    bins=30,
-    alpha=0.7,
-    color="blue",
-    edgecolor="black",
-)
-plt.xlabel("Total Case Duration (Days)")
-plt.ylabel("Number of Cases")
-plt.title("Distribution of Case Completion Times in ABM")
-plt.show()
-
-# **Plot Final Case Outcomes**
-outcomes = df_agents["State"].value_counts()
-plt.figure(figsize=(10, 5))
-outcomes.plot(kind="bar", color="red", edgecolor="black", alpha=0.7)
-plt.xlabel("Final Outcome")
-plt.ylabel("Number of Cases")
-plt.title("Final Case Outcomes in the Justice System")
-plt.xticks(rotation=45)
-plt.show()
-
-# **Plot Prison Population Over Time**
-plt.figure(figsize=(10, 5))
-plt.plot(
-    model_data.index,
-    model_data["Prison Population"],
-    label="Prison Population",
-    color="purple",
-)
-plt.xlabel("Simulation Time Steps")
-plt.ylabel("Number of Prisoners")
-plt.title("Prison Population Over Time in the Justice System")
-plt.legend()
-plt.show()
+if __name__ == "__main__":
+    # **Run the ABM simulation**
+    justice_model = JusticeSystemModel(num_cases=100, max_steps=500)
+    justice_model.run_model()
+
+    # **Collect and analyze results**
+    model_data = justice_model.datacollector.get_model_vars_dataframe()
+
+    # Final record of every case, including those retired from the schedule
+    df_agents = justice_model.agent_snapshot().reset_index()
+    print(df_agents.columns)
+    # Compute total case duration
+    df_agents["Total Duration"] = df_agents["End Time"] - df_agents["Start Time"]
+
+    # Print summary statistics
+    print("Summary Statistics:")
+    print(df_agents[["Total Duration"]].describe())
+
+    # **Plot Case Completion Times**
+    plt.figure(figsize=(10, 5))
+    plt.hist(
+        df_agents["Total Duration"].dropna(),
+        bins=30,
+        alpha=0.7,
+        color="blue",
+        edgecolor="black",
+    )
+    plt.xlabel("Total Case Duration (Days)")
+    plt.ylabel("Number of Cases")
+    plt.title("Distribution of Case Completion Times in ABM")
+    plt.show()
+
+    # **Plot Final Case Outcomes**
+    outcomes = df_agents["State"].value_counts()
+    plt.figure(figsize=(10, 5))
+    outcomes.plot(kind="bar", color="red", edgecolor="black", alpha=0.7)
+    plt.xlabel("Final Outcome")
+    plt.ylabel("Number of Cases")
+    plt.title("Final Case Outcomes in the Justice System")
+    plt.xticks(rotation=45)
+    plt.show()
+
+    # **Plot Prison Population Over Time**
+    plt.figure(figsize=(10, 5))
+    plt.plot(
+        model_data.index,
+        model_data["Prison Population"],
+        label="Prison Population",
+        color="purple",
+    )
+    plt.xlabel("Simulation Time Steps")
+    plt.ylabel("Number of Prisoners")
+    plt.title("Prison Population Over Time in the Justice System")
+    plt.legend()
+    plt.show()
@@ -0,0 +1,128 @@
+"""Parallel parameter sweep over the Mesa justice system ABM.
+
+Every configuration runs in a worker process with its own generator spawned
+from one np.random.SeedSequence, so a sweep is reproducible from a single
+seed however it is scheduled. Each run is reduced to one row, and the rows are
+stored as a typed columnar table (optionally written to Parquet).
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from mesa_simulation import (
+    PRISON_CAPACITY,
+    JusticeSystemModel,
+    processing_times,
+    states,
+    transition_probabilities,
+)
+
+
+def sweep_grid(
+    num_cases=(100,),
+    prison_capacity=(PRISON_CAPACITY,),
+    transition_probabilities=(transition_probabilities,),
+    processing_times=(processing_times,),
+):
+    """Every combination of the given parameter values, one dict per configuration."""
+    names = [
+        "num_cases",
+        "prison_capacity",
+        "transition_probabilities",
+        "processing_times",
+    ]
+    values = [num_cases, prison_capacity, transition_probabilities, processing_times]
+    return [dict(zip(names, combination)) for combination in product(*values)]
+
+
+def scale_probabilities(factor):
+    """transition_probabilities with every proceed chance scaled, capped at 1."""
+    return {
+        stage: min(1.0, probability * factor)
+        for stage, probability in transition_probabilities.items()
+    }
+
+
+def scale_processing_times(factor):
+    """processing_times with every mean and standard deviation scaled."""
+    return {
+        stage: (mean * factor, sd * factor)
+        for stage, (mean, sd) in processing_times.items()
+    }
+
+
+def run_configuration(configuration, seed):
+    """Run one configuration and reduce it to a row of parameters and results."""
+    model = JusticeSystemModel(collect="events", seed=seed, **configuration)
+    model.run_model()
+
+    row = {
+        "num_cases": configuration["num_cases"],
+        "prison_capacity": configuration["prison_capacity"],
+    }
+    for stage, probability in configuration["transition_probabilities"].items():
+        row[f"p_{stage}"] = probability
+    for stage, (mean, sd) in configuration["processing_times"].items():
+        row[f"mean_{stage}"], row[f"sd_{stage}"] = mean, sd
+
+    cases = model.agent_snapshot()
+    events = model.events_frame()
+    counts = events.loc[events["To"] == "D", "From"].value_counts()
+    row["steps"] = model.steps
+    row["prison_population"] = model.prison_population
+    row["mean_duration"] = (cases["End Time"] - cases["Start Time"]).mean()
+    for stage in states[:-1]:
+        row[f"dismissed_at_{stage}"] = counts.get(stage, 0)
+    return row
+
+
+def compact(results):
+    """Downcast the columns of a results table to the smallest fitting dtypes."""
+    for name, column in results.items():
+        kind = "integer" if column.dtype.kind in "iu" else "float"
+        results[name] = pd.to_numeric(column, downcast=kind)
+    return results
+
+
+def run_sweep(configurations, seed=0, processes=None, path=None):
+    """Run every configuration across a process pool, one result row each.
+
+    With a path the table is also written to Parquet.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(configurations))
+    processes = processes or os.cpu_count()
+    chunksize = max(1, len(configurations) // (4 * processes))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        rows = pool.map(run_configuration, configurations, seeds, chunksize=chunksize)
+        results = compact(pd.DataFrame(list(rows)))
+    if path is not None:
+        results.to_parquet(path, index=False)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Parquet file for the results")
+    args = parser.parse_args()
+
+    configurations = sweep_grid(
+        num_cases=[500, 1000, 2000],
+        prison_capacity=[25, 50, 100, 200, 500],
+        transition_probabilities=[scale_probabilities(f) for f in (0.9, 1.0, 1.1)],
+        processing_times=[scale_processing_times(f) for f in (0.8, 1.0, 1.2)],
+    )
+    start = time.perf_counter()
+    results = run_sweep(configurations, args.seed, args.processes, args.output)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(configurations)} configurations in {elapsed:.1f} s "
+        f"({results.memory_usage(deep=True).sum() / 2**10:.0f} KiB of results)"
+    )
+    print(results.describe().T.to_string())
@@ -0,0 +1,252 @@
+"""Timing and stress checks for the DES model.
+
+Run from this directory, e.g. ``python benchmarks.py stress``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import des_simulation
+import numpy as np
+import pandas as pd
+import simpy
+
+
+def bench_stress(arrivals_per_day=10000, days=5, monitor_interval=0.5):
+    """Backlog growth and run time at realistic daily arrival volumes."""
+    num_cases = int(arrivals_per_day * days)
+    start = time.perf_counter()
+    justice_system = des_simulation.run_simulation(
+        num_cases=num_cases,
+        simulation_time=days,
+        mean_interarrival=1 / arrivals_per_day,
+        monitor_interval=monitor_interval,
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{num_cases} arrivals over {days} days in {elapsed:.1f} s "
+        f"({num_cases / elapsed:.0f} arrivals/s)"
+    )
+    monitor = justice_system.monitor_frame()
+    averages = justice_system.time_averages()
+    for name, samples in monitor.groupby("resource"):
+        print(
+            f"{name:>16}: queue {samples['queue_length'].iloc[0]:.0f} -> "
+            f"{samples['queue_length'].iloc[-1]:.0f}, "
+            f"time-weighted utilization {averages.loc[name, 'utilization']:.2f}"
+        )
+    print(
+        f"{justice_system.num_samples} monitor samples in "
+        f"{justice_system.monitor_samples.nbytes / 2**10:.0f} KiB"
+    )
+
+
+def _count_events(num_cases, mean_interarrival, simulation_time, seed, **system_kwargs):
+    """Run one replication step by step, returning (events, seconds, case log)."""
+    env = simpy.Environment()
+    justice_system = des_simulation.JusticeSystem(
+        env, rng=np.random.default_rng(seed), **system_kwargs
+    )
+    env.process(
+        des_simulation.case_arrivals(env, justice_system, num_cases, mean_interarrival)
+    )
+    events = 0
+    start = time.perf_counter()
+    while env.peek() < simulation_time:
+        env.step()
+        events += 1
+    return events, time.perf_counter() - start, justice_system.case_log.to_frame()
+
+
+def bench_variates(num_cases=50000, seed=0):
+    """Events/sec with scalar RNG calls against pre-drawn variate blocks."""
+    # Generous capacities keep the run dominated by stage events, not queues
+    kwargs = dict(
+        num_cases=num_cases,
+        mean_interarrival=0.01,
+        simulation_time=np.inf,
+        seed=seed,
+        num_police=1000,
+        num_magistrate_judges=1000,
+        num_crown_judges=1000,
+        prison_capacity=num_cases,
+    )
+    logs = {}
+    for label, batch_size in [("scalar", None), ("batched", 4096)]:
+        events, elapsed, logs[label] = _count_events(batch_size=batch_size, **kwargs)
+        print(
+            f"{label:>8}: {events} events in {elapsed:.1f} s "
+            f"({events / elapsed:.0f} events/s)"
+        )
+    pd.testing.assert_frame_equal(logs["scalar"], logs["batched"], check_exact=True)
+    print("case logs bitwise identical")
+
+
+def bench_case_log(num_cases=1000000, chunk_size=65536):
+    """Peak memory of recording num_cases cases as dicts vs a CaseLog file."""
+    from case_log import CaseLog
+
+    log = {"case_id": 0, "start_time": 0.0, "end_time": 1.0, "dismissed_at": "M"}
+    for stage in des_simulation.stages[:4]:
+        log.update(
+            {f"{stage}_start": 0.0, f"{stage}_end": 1.0, f"{stage}_duration": 1.0}
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cases.parquet")
+        recorders = {
+            "list of dicts": lambda: ([], list.append),
+            "CaseLog (parquet)": lambda: (
+                CaseLog(des_simulation.stages, path, chunk_size),
+                CaseLog.append,
+            ),
+        }
+        for name, make_recorder in recorders.items():
+            tracemalloc.start()
+            start = time.perf_counter()
+            recorder, append = make_recorder()
+            for case_id in range(num_cases):
+                append(recorder, dict(log, case_id=case_id))
+            if isinstance(recorder, CaseLog):
+                recorder.close()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:>18}: {elapsed:5.1f} s, peak {peak / 2**20:7.1f} MiB")
+
+
+def bench_heap_engine(num_cases=50000, num_replications=20, seed=0):
+    """Throughput of the heap engine against simpy, and their equivalence.
+
+    Equivalence is checked twice: with a shared seed the two engines draw the
+    same variates and should give identical case logs, and across independent
+    seeds the pooled case durations and dismissal stages should not differ
+    significantly (two-sample KS and chi-square tests).
+    """
+    from heap_engine import run_heap_simulation
+    from scipy import stats
+
+    kwargs = dict(
+        num_cases=num_cases,
+        mean_interarrival=0.05,
+        simulation_time=np.inf,
+        num_police=200,
+        num_magistrate_judges=200,
+        num_crown_judges=200,
+    )
+    events, simpy_elapsed, simpy_log = _count_events(seed=seed, **kwargs)
+    start = time.perf_counter()
+    heap_log = run_heap_simulation(seed=seed, **kwargs).to_frame()
+    heap_elapsed = time.perf_counter() - start
+    print(f"simpy: {simpy_elapsed:6.2f} s ({events / simpy_elapsed:.0f} events/s)")
+    print(
+        f" heap: {heap_elapsed:6.2f} s ({events / heap_elapsed:.0f} simpy-equivalent "
+        f"events/s, {simpy_elapsed / heap_elapsed:.1f}x)"
+    )
+    simpy_log = simpy_log.sort_values("case_id", ignore_index=True)
+    pd.testing.assert_frame_equal(simpy_log, heap_log, check_exact=True)
+    print("identical case logs with a shared seed")
+
+    seeds = np.random.SeedSequence(seed).spawn(2 * num_replications)
+    small = dict(num_cases=2000, mean_interarrival=0.5, simulation_time=2000)
+    simpy_runs = pd.concat(
+        des_simulation.run_simulation(seed=s, **small).case_log.to_frame()
+        for s in seeds[:num_replications]
+    )
+    heap_runs = pd.concat(
+        run_heap_simulation(seed=s, **small).to_frame()
+        for s in seeds[num_replications:]
+    )
+    durations = [
+        runs["end_time"] - runs["start_time"] for runs in (simpy_runs, heap_runs)
+    ]
+    ks = stats.ks_2samp(*durations)
+    table = pd.crosstab(
+        np.repeat(["simpy", "heap"], [len(simpy_runs), len(heap_runs)]),
+        pd.concat([simpy_runs["dismissed_at"], heap_runs["dismissed_at"]])
+        .cat.add_categories("none")
+        .fillna("none")
+        .values,
+    )
+    chi2 = stats.chi2_contingency(table)
+    print(
+        f"independent seeds: duration KS p={ks.pvalue:.3f}, "
+        f"dismissal stage chi-square p={chi2.pvalue:.3f}"
+    )
+
+
+def bench_checkpoint(num_cases=200000, warm_up=18000, horizon=20000, seed=0):
+    """Branching what-if scenarios from a saved warm-up vs rerunning each from 0."""
+    from heap_engine import HeapJusticeSystem, branch_scenarios
+
+    # Ten arrivals a day; the Crown Court is short of judges at this volume
+    kwargs = dict(
+        num_police=150,
+        num_magistrate_judges=25,
+        num_crown_judges=30,
+    )
+    scenarios = {
+        "baseline": {},
+        "crown_court +10": {"crown_court": 40},
+        "prison places 150": {"prison": 150},
+    }
+
+    def make_system():
+        return HeapJusticeSystem(
+            num_cases, 0.1, rng=np.random.default_rng(seed), **kwargs
+        )
+
+    start = time.perf_counter()
+    for changes in scenarios.values():
+        justice_system = make_system()
+        justice_system.run(warm_up)
+        for resource, capacity in changes.items():
+            justice_system.set_capacity(resource, capacity)
+        justice_system.run(horizon)
+        if not changes:
+            uninterrupted = justice_system.to_frame()
+    rerun = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "warm_up.npz")
+        start = time.perf_counter()
+        justice_system = make_system()
+        justice_system.run(warm_up)
+        justice_system.save(path)
+        branches = branch_scenarios(path, scenarios, horizon)
+        branched = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+    print(f"rerun from 0: {rerun:.1f} s, branched from checkpoint: {branched:.1f} s")
+    print(f"checkpoint at t={warm_up}: {size / 2**20:.1f} MiB")
+    pd.testing.assert_frame_equal(
+        branches["baseline"].to_frame(), uninterrupted, check_exact=True
+    )
+    print("baseline branch identical to uninterrupted run")
+    for name, branch in branches.items():
+        cases = branch.to_frame()
+        print(
+            f"{name:>20}: {len(cases)} completed, mean duration "
+            f"{(cases['end_time'] - cases['start_time']).mean():.1f} days"
+        )
+
+
+benchmarks = {
+    "stress": bench_stress,
+    "variates": bench_variates,
+    "case_log": bench_case_log,
+    "heap_engine": bench_heap_engine,
+    "checkpoint": bench_checkpoint,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(benchmarks)}")
+    args = parser.parse_args()
+    for name in args.names or benchmarks:
+        print(f"== {name} ==")
+        benchmarks[name]()
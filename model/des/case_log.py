@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+
+class CaseLog:
+    """Columnar record of completed cases with typed, preallocated arrays.
+
+    Each field (case_id, start_time, end_time, {stage}_start/_end/_duration and
+    dismissed_at as an int8 stage code, -1 if never dismissed) has its own array
+    of chunk_size rows. A full chunk is flushed: with a path it is written out
+    as a Parquet row group or an Arrow IPC record batch and the arrays are
+    reused, so memory stays at one chunk however many cases are simulated, and
+    dataset() scans the file lazily afterwards. Without a path the chunks are
+    kept in memory.
+    """
+
+    def __init__(self, stages, path=None, chunk_size=65536, file_format="parquet"):
+        if file_format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown file_format {file_format!r}")
+        self.stages = list(stages)
+        self.stage_codes = {stage: code for code, stage in enumerate(self.stages)}
+        self.path = path
+        self.chunk_size = chunk_size
+        self.file_format = file_format
+
+        # Stage fields of stages a case never reaches are left NaN
+        self._float_fields = ["start_time", "end_time"] + [
+            f"{stage}_{field}"
+            for stage in self.stages
+            for field in ("start", "end", "duration")
+        ]
+        # All float fields of a row are written with one assignment and split
+        # into separate columns on flush
+        self._case_ids = np.empty(chunk_size, np.int64)
+        self._floats = np.empty((chunk_size, len(self._float_fields)), np.float64)
+        self._dismissed_at = np.empty(chunk_size, np.int8)
+        self._size = 0
+        self._memory_chunks = []
+        self._writer = None
+        self.num_cases = 0
+
+    def append(self, log):
+        """Record one completed case from its log dict."""
+        row = self._size
+        self._case_ids[row] = log["case_id"]
+        self._floats[row] = [log.get(name, np.nan) for name in self._float_fields]
+        self._dismissed_at[row] = self.stage_codes.get(log.get("dismissed_at"), -1)
+        self._size += 1
+        self.num_cases += 1
+        if self._size == self.chunk_size:
+            self.flush()
+
+    def _columns(self, size):
+        columns = {"case_id": self._case_ids[:size]}
+        for i, name in enumerate(self._float_fields):
+            columns[name] = self._floats[:size, i]
+        columns["dismissed_at"] = self._dismissed_at[:size]
+        return columns
+
+    def flush(self):
+        """Move the rows recorded so far out of the chunk arrays."""
+        if not self._size:
+            return
+        columns = self._columns(self._size)
+        if self.path is None:
+            self._memory_chunks.append({k: v.copy() for k, v in columns.items()})
+        else:
+            import pyarrow as pa
+
+            batch = pa.RecordBatch.from_pydict(columns)
+            if self._writer is None:
+                self._writer = self._open_writer(batch.schema)
+            self._writer.write_batch(batch)
+        self._size = 0
+
+    def _open_writer(self, schema):
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(self.path, schema)
+        import pyarrow as pa
+
+        return pa.ipc.new_file(self.path, schema)
+
+    def close(self):
+        """Flush the last partial chunk and finish the file, if any."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def dataset(self):
+        """Lazy pyarrow dataset over the written file."""
+        import pyarrow.dataset as ds
+
+        self.close()
+        return ds.dataset(
+            self.path, format="parquet" if self.file_format == "parquet" else "ipc"
+        )
+
+    def to_frame(self):
+        """Load the whole log as a DataFrame with dismissed_at as stage names."""
+        if self.path is None:
+            self.flush()
+            frame = pd.DataFrame(
+                {
+                    name: np.concatenate(
+                        [chunk[name] for chunk in self._memory_chunks] or [values]
+                    )
+                    for name, values in self._columns(0).items()
+                }
+            )
+        else:
+            frame = self.dataset().to_table().to_pandas()
+        frame["dismissed_at"] = pd.Categorical.from_codes(
+            frame["dismissed_at"], categories=self.stages
+        )
+        return frame
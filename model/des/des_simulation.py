@@ -2,8 +2,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import simpy
+from case_log import CaseLog
 
-# Define processing time distributions (Mean and Standard Deviation in days)
+# Define processing time distributions (Mean and Standard Deviation in days).
+# A (mean, sd) pair is normal; other distributions can be given as the name of
+# a numpy Generator method followed by its arguments, e.g. ("gamma", 4, 2.5)
 processing_times = {
     "U": (10, 2),  # Under investigation
     "C": (5, 1),  # Charging decision
@@ -20,24 +23,212 @@ NUM_MAGISTRATE_JUDGES = 3
 NUM_CROWN_JUDGES = 2
 PRISON_CAPACITY = 500
 
-# Data collection structures
-case_data = []
-prison_population = []
+# Stages every case passes through in order, and its chance to proceed at each
+stages = ["U", "C", "Mb", "M", "Cb", "Cc", "P"]
+probabilities = [0.8, 0.7, 0.6, 0.5, 0.7, 0.8, 1.0]
+
+# Resource a case must hold while each stage is processed; the backlog stages
+# are listing delays that do not occupy anyone
+stage_resources = {
+    "U": "police",
+    "C": "police",
+    "M": "magistrate_court",
+    "Cc": "crown_court",
+}
+
+
+def draw_variates(rng, spec, size=None):
+    """Draw from a processing_times entry (or ("random",) for uniforms)."""
+    if isinstance(spec[0], str):
+        name, *args = spec
+        return getattr(rng, name)(*args, size=size)
+    return rng.normal(*spec, size=size)
+
+
+class VariateBuffer:
+    """One stream of variates, pre-drawn in blocks and refilled lazily.
+
+    Scalar NumPy RNG calls dominate the profile at millions of events, so
+    block_size variates are drawn per call instead. Generator draws the same
+    sequence either way, so buffered runs are bitwise identical to
+    block_size=None, which draws one variate per call.
+    """
+
+    def __init__(self, rng, spec, block_size=4096):
+        self.rng = rng
+        self.spec = spec
+        self.block_size = block_size
+        self._block = []
+        self._position = 0
+
+    def next(self):
+        if self.block_size is None:
+            return draw_variates(self.rng, self.spec)
+        if self._position == len(self._block):
+            # Python floats index and compare faster than NumPy scalars
+            self._block = draw_variates(self.rng, self.spec, self.block_size).tolist()
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+
+def variate_streams(rng, batch_size):
+    """Buffered streams for each stage duration, prison sentences and decisions.
+
+    Each stream has its own generator spawned from rng, so the values a stream
+    produces do not depend on how draws from different streams interleave.
+    """
+    streams = dict(processing_times, sentence=processing_times["P"])
+    streams["decision"] = ("random",)
+    return {
+        name: VariateBuffer(stream_rng, spec, batch_size)
+        for (name, spec), stream_rng in zip(streams.items(), rng.spawn(len(streams)))
+    }
 
 
 class JusticeSystem:
-    def __init__(self, env):
+    def __init__(
+        self,
+        env,
+        num_police=NUM_POLICE,
+        num_magistrate_judges=NUM_MAGISTRATE_JUDGES,
+        num_crown_judges=NUM_CROWN_JUDGES,
+        prison_capacity=PRISON_CAPACITY,
+        rng=None,
+        batch_size=4096,
+        case_log=None,
+    ):
         self.env = env
-        self.police = simpy.Resource(env, capacity=NUM_POLICE)
-        self.magistrate_court = simpy.Resource(env, capacity=NUM_MAGISTRATE_JUDGES)
-        self.crown_court = simpy.Resource(env, capacity=NUM_CROWN_JUDGES)
-        self.prison = simpy.Container(env, init=0, capacity=PRISON_CAPACITY)
+        # Every random draw of a replication comes from its own generator
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.variates = variate_streams(self.rng, batch_size)
+        self.police = simpy.Resource(env, capacity=num_police)
+        self.magistrate_court = simpy.Resource(env, capacity=num_magistrate_judges)
+        self.crown_court = simpy.Resource(env, capacity=num_crown_judges)
+        self.prison = simpy.Container(env, init=0, capacity=prison_capacity)
+
+        # Data collection structures; completed cases go to a columnar log,
+        # in memory unless a CaseLog writing to a file is passed in
+        self.case_log = case_log if case_log is not None else CaseLog(stages)
+
+        # Resources sampled by monitor(); for the prison the places taken are
+        # its level in use and cases waiting for a place are its queue
+        self.resource_names = sorted(set(stage_resources.values())) + ["prison"]
+        self._resources = [getattr(self, name) for name in self.resource_names[:-1]]
+        self.capacities = np.array(
+            [getattr(self, name).capacity for name in self.resource_names], float
+        )
+        self.monitor_fields = ["queue_length", "in_use", "mean_wait"]
+        self.monitor_times = np.empty(0)
+        self.monitor_samples = np.empty(
+            (0, len(self.resource_names), len(self.monitor_fields))
+        )
+        self.num_samples = 0
+        # Waits of requests granted since the last sample
+        self._wait_sum = dict.fromkeys(self.resource_names, 0.0)
+        self._wait_count = dict.fromkeys(self.resource_names, 0)
+        # Running integrals over time of each queue length and level in use,
+        # brought up to date before every change to them
+        self._level_area = [[0.0, 0.0] for _ in self.resource_names]
+        self._area_time = 0.0
+
+    def _levels(self):
+        """Current (queue length, in use) of every monitored resource."""
+        levels = [(len(resource.queue), resource.count) for resource in self._resources]
+        return levels + [(len(self.prison.put_queue), self.prison.level)]
+
+    def _accumulate_levels(self):
+        elapsed = self.env.now - self._area_time
+        if elapsed:
+            for area, (queue_length, in_use) in zip(self._level_area, self._levels()):
+                area[0] += queue_length * elapsed
+                area[1] += in_use * elapsed
+            self._area_time = self.env.now
+
+    def _record_wait(self, name, wait):
+        self._wait_sum[name] += wait
+        self._wait_count[name] += 1
 
     def process_stage(self, stage, case_id):
         """Simulate a processing stage with random duration."""
-        duration = np.random.normal(*processing_times[stage])
-        yield self.env.timeout(max(1, duration))
-        return np.random.rand()  # Random chance to proceed
+        duration = self.variates[stage].next()
+        resource_name = stage_resources.get(stage)
+        if resource_name is None:
+            yield self.env.timeout(max(1, duration))
+        else:
+            requested = self.env.now
+            self._accumulate_levels()
+            with getattr(self, resource_name).request() as request:
+                yield request
+                self._record_wait(resource_name, self.env.now - requested)
+                yield self.env.timeout(max(1, duration))
+                self._accumulate_levels()
+        return self.variates["decision"].next()  # Random chance to proceed
+
+    def monitor(self, interval, horizon=np.inf):
+        """Sample queue length, level in use and mean wait of every resource.
+
+        Samples are taken every interval into an array preallocated for the
+        horizon (and doubled if the run goes on past it), so memory depends on
+        horizon / interval rather than on the number of events.
+        """
+        size = int(horizon // interval) + 1 if np.isfinite(horizon) else 1024
+        self.monitor_times = np.empty(size)
+        self.monitor_samples = np.empty(
+            (size, len(self.resource_names), len(self.monitor_fields))
+        )
+        while True:
+            row = self.num_samples
+            if row == len(self.monitor_times):
+                self.monitor_times = np.resize(self.monitor_times, 2 * row)
+                self.monitor_samples = np.resize(
+                    self.monitor_samples, (2 * row,) + self.monitor_samples.shape[1:]
+                )
+            self.monitor_times[row] = self.env.now
+            for i, (name, levels) in enumerate(
+                zip(self.resource_names, self._levels())
+            ):
+                count = self._wait_count[name]
+                mean_wait = self._wait_sum[name] / count if count else np.nan
+                self.monitor_samples[row, i] = (*levels, mean_wait)
+                self._wait_sum[name], self._wait_count[name] = 0.0, 0
+            self.num_samples += 1
+            yield self.env.timeout(interval)
+
+    def monitor_frame(self):
+        """Monitor samples of every resource as one long-format DataFrame."""
+        samples = self.monitor_samples[: self.num_samples]
+        return pd.concat(
+            [
+                pd.DataFrame(
+                    dict(zip(self.monitor_fields, samples[:, i].T)),
+                    index=self.monitor_times[: self.num_samples],
+                )
+                .rename_axis("time")
+                .reset_index()
+                .assign(utilization=lambda frame: frame["in_use"] / capacity)
+                .assign(resource=name)
+                for i, (name, capacity) in enumerate(
+                    zip(self.resource_names, self.capacities)
+                )
+            ],
+            ignore_index=True,
+        )
+
+    def time_averages(self):
+        """Time-weighted mean queue length, level in use and utilization so far."""
+        self._accumulate_levels()
+        area = np.array(self._level_area) / self.env.now
+        return pd.DataFrame(
+            {
+                "queue_length": area[:, 0],
+                "in_use": area[:, 1],
+                "utilization": area[:, 1] / self.capacities,
+            },
+            index=pd.Index(self.resource_names, name="resource"),
+        )
 
 
 def case_process(env, case_id, justice_system):
@@ -45,17 +236,6 @@ def case_process(env, case_id, justice_system):
     entry_time = env.now
     log = {"case_id": case_id, "start_time": entry_time, "end_time": None}
 
-    stages = ["U", "C", "Mb", "M", "Cb", "Cc", "P"]
-    probabilities = [
-        0.8,
-        0.7,
-        0.6,
-        0.5,
-        0.7,
-        0.8,
-        1.0,
-    ]  # Chance to proceed at each stage
-
     for i, stage in enumerate(stages):
         start = env.now
         move_forward = yield env.process(justice_system.process_stage(stage, case_id))
@@ -68,56 +248,94 @@ def case_process(env, case_id, justice_system):
         if move_forward > probabilities[i]:  # Case dismissed at this stage
             log["dismissed_at"] = stage
             log["end_time"] = end
-            case_data.append(log)
+            justice_system.case_log.append(log)
             return
 
-        if stage == "P":  # Entering prison
-            justice_system.prison.put(1)
-            prison_population.append((env.now, justice_system.prison.level))
-            yield env.timeout(np.random.normal(*processing_times["P"]))
-            justice_system.prison.get(1)
-            prison_population.append((env.now, justice_system.prison.level))
+        if stage == "P":  # Entering prison, waiting for a place if it is full
+            requested = env.now
+            justice_system._accumulate_levels()
+            yield justice_system.prison.put(1)
+            justice_system._record_wait("prison", env.now - requested)
+            yield env.timeout(justice_system.variates["sentence"].next())
+            justice_system._accumulate_levels()
+            yield justice_system.prison.get(1)
 
     log["end_time"] = env.now
-    case_data.append(log)  # <- This now executes
-
+    justice_system.case_log.append(log)
 
-# **FIXED Simulation setup**
-def run_simulation(num_cases=100, simulation_time=1000):
-    env = simpy.Environment()
-    justice_system = JusticeSystem(env)
 
-    # Generate case processes
+def case_arrivals(env, justice_system, num_cases, mean_interarrival):
+    """Start num_cases cases with exponentially distributed inter-arrival times."""
     for i in range(num_cases):
         env.process(case_process(env, i, justice_system))
-        env.timeout(np.random.exponential(scale=5))  # No `yield` here!
+        yield env.timeout(justice_system.rng.exponential(scale=mean_interarrival))
+
+
+def run_simulation(
+    num_cases=100,
+    simulation_time=1000,
+    mean_interarrival=5,
+    monitor_interval=1,
+    seed=None,
+    **system_kwargs,
+):
+    """Run one replication and return its JusticeSystem holding the results.
+
+    seed (an int or np.random.SeedSequence) seeds the replication's own
+    generator; system_kwargs are passed on to JusticeSystem (capacities such
+    as num_police, batch_size, case_log).
+    """
+    env = simpy.Environment()
+    justice_system = JusticeSystem(
+        env, rng=np.random.default_rng(seed), **system_kwargs
+    )
+
+    env.process(case_arrivals(env, justice_system, num_cases, mean_interarrival))
+    env.process(justice_system.monitor(monitor_interval, simulation_time))
 
     env.run(until=simulation_time)  # Run simulation
+    justice_system.case_log.close()
+    return justice_system
+
+
+if __name__ == "__main__":
+    # **Run the simulation**
+    justice_system = run_simulation()
 
+    # **Check collected data**
+    if not justice_system.case_log.num_cases:
+        print("Error: No case data was collected!")
+    else:
+        print(f"Collected data for {justice_system.case_log.num_cases} cases.")
 
-# **Run the fixed simulation**
-run_simulation()
+    # **Convert collected data into Pandas DataFrame**
+    df = justice_system.case_log.to_frame()
 
-# **Check collected data**
-if not case_data:
-    print("Error: No case data was collected!")
-else:
-    print(f"Collected data for {len(case_data)} cases.")
+    # **Compute total case duration**
+    df["total_duration"] = df["end_time"] - df["start_time"]
 
-# **Convert collected data into Pandas DataFrame**
-df = pd.DataFrame(case_data)
+    # **Summary statistics**
+    print("Summary Statistics:")
+    print(df.describe())
 
-# **Compute total case duration**
-df["total_duration"] = df["end_time"] - df["start_time"]
+    # **Visualization**
+    plt.figure(figsize=(10, 5))
+    plt.hist(df["total_duration"], bins=20, alpha=0.7, color="b", edgecolor="black")
+    plt.xlabel("Total Case Duration (Days)")
+    plt.ylabel("Number of Cases")
+    plt.title("Distribution of Total Case Duration")
+    plt.show()
 
-# **Summary statistics**
-print("Summary Statistics:")
-print(df.describe())
+    # **Time-weighted resource usage**
+    print(justice_system.time_averages())
 
-# **Visualization**
-plt.figure(figsize=(10, 5))
-plt.hist(df["total_duration"], bins=20, alpha=0.7, color="b", edgecolor="black")
-plt.xlabel("Total Case Duration (Days)")
-plt.ylabel("Number of Cases")
-plt.title("Distribution of Total Case Duration")
-plt.show()
+    # **Queue lengths over time**
+    monitor = justice_system.monitor_frame()
+    plt.figure(figsize=(10, 5))
+    for name, samples in monitor.groupby("resource"):
+        plt.plot(samples["time"], samples["queue_length"], label=name)
+    plt.xlabel("Time (Days)")
+    plt.ylabel("Cases Waiting")
+    plt.title("Resource Queue Lengths")
+    plt.legend()
+    plt.show()
@@ -0,0 +1,320 @@
+"""Heap-based event engine for the linear case pipeline U -> C -> Mb -> M -> Cb -> Cc -> P.
+
+The pipeline is fixed, so a simpy process per case and per stage is more
+machinery than it needs. This engine keeps a plain heapq calendar of
+(time, sequence, event, case) entries, FIFO queues for the police and courts,
+a counter with a waiting line for the prison, and the case records in NumPy
+arrays. Stages, capacities, prison semantics and random streams match
+des_simulation.JusticeSystem, so both engines simulate the same model.
+
+Unlike simpy's suspended generators, the engine's state is plain data, so a
+long run can be saved part-way with save() and several what-if scenarios
+branched from that shared warm-up with load() or branch_scenarios().
+"""
+
+import heapq
+import json
+from collections import deque
+from itertools import count
+
+import numpy as np
+import pandas as pd
+from des_simulation import (
+    NUM_CROWN_JUDGES,
+    NUM_MAGISTRATE_JUDGES,
+    NUM_POLICE,
+    PRISON_CAPACITY,
+    VariateBuffer,
+    probabilities,
+    stage_resources,
+    stages,
+    variate_streams,
+)
+
+ARRIVAL, STAGE_END, SENTENCE_END = range(3)
+
+
+class HeapJusticeSystem:
+    def __init__(
+        self,
+        num_cases,
+        mean_interarrival,
+        num_police=NUM_POLICE,
+        num_magistrate_judges=NUM_MAGISTRATE_JUDGES,
+        num_crown_judges=NUM_CROWN_JUDGES,
+        prison_capacity=PRISON_CAPACITY,
+        rng=None,
+        batch_size=4096,
+    ):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.variates = variate_streams(self.rng, batch_size)
+        self.num_cases = num_cases
+        self.mean_interarrival = mean_interarrival
+        self.now = 0.0
+
+        # Servers busy and FIFO line of (case, service time) per resource
+        self.capacity = {
+            "police": num_police,
+            "magistrate_court": num_magistrate_judges,
+            "crown_court": num_crown_judges,
+        }
+        self.busy = dict.fromkeys(self.capacity, 0)
+        self.queues = {name: deque() for name in self.capacity}
+        self.stage_resource = [stage_resources.get(stage) for stage in stages]
+        self.prison_capacity = prison_capacity
+        self.prison_level = 0
+        self.prison_queue = deque()
+
+        # Array-backed case records, NaN until a case reaches that point
+        self.stage = np.zeros(num_cases, np.int8)
+        self.start_time = np.full(num_cases, np.nan)
+        self.end_time = np.full(num_cases, np.nan)
+        self.stage_start = np.full((num_cases, len(stages)), np.nan)
+        self.stage_end = np.full((num_cases, len(stages)), np.nan)
+        self.dismissed_at = np.full(num_cases, -1, np.int8)
+
+        self._sequence = count()
+        self.calendar = []
+        self.events = 0
+        if num_cases:
+            self._schedule(0.0, ARRIVAL, 0)
+
+    def _schedule(self, time, event, case):
+        heapq.heappush(self.calendar, (time, next(self._sequence), event, case))
+
+    def _begin_stage(self, case, k):
+        self.stage[case] = k
+        self.stage_start[case, k] = self.now
+        duration = max(1, self.variates[stages[k]].next())
+        resource = self.stage_resource[k]
+        if resource is None:
+            self._schedule(self.now + duration, STAGE_END, case)
+        elif self.busy[resource] < self.capacity[resource]:
+            self.busy[resource] += 1
+            self._schedule(self.now + duration, STAGE_END, case)
+        else:
+            self.queues[resource].append((case, duration))
+
+    def _enter_prison(self, case):
+        self.prison_level += 1
+        self._schedule(self.now + self.variates["sentence"].next(), SENTENCE_END, case)
+
+    def _end_stage(self, case):
+        k = self.stage[case]
+        self.stage_end[case, k] = self.now
+        resource = self.stage_resource[k]
+        if resource is not None:
+            # Hand the server straight to the next case in line, unless
+            # set_capacity has since lowered the number of servers
+            if self.queues[resource] and self.busy[resource] <= self.capacity[resource]:
+                waiting, duration = self.queues[resource].popleft()
+                self._schedule(self.now + duration, STAGE_END, waiting)
+            else:
+                self.busy[resource] -= 1
+        if self.variates["decision"].next() > probabilities[k]:
+            self.dismissed_at[case] = k
+            self.end_time[case] = self.now
+        elif stages[k] == "P":
+            if self.prison_level < self.prison_capacity:
+                self._enter_prison(case)
+            else:
+                self.prison_queue.append(case)
+        else:
+            self._begin_stage(case, k + 1)
+
+    def _end_sentence(self, case):
+        self.prison_level -= 1
+        if self.prison_queue and self.prison_level < self.prison_capacity:
+            self._enter_prison(self.prison_queue.popleft())
+        self.end_time[case] = self.now
+
+    def set_capacity(self, resource, capacity):
+        """Change the number of servers of a resource (or "prison" places) from now.
+
+        Extra capacity is taken up by waiting cases straight away; when capacity
+        is cut, cases in progress finish and freed servers stay idle until the
+        resource is back under its new capacity.
+        """
+        if resource == "prison":
+            self.prison_capacity = capacity
+            while self.prison_queue and self.prison_level < capacity:
+                self._enter_prison(self.prison_queue.popleft())
+            return
+        self.capacity[resource] = capacity
+        queue = self.queues[resource]
+        while queue and self.busy[resource] < capacity:
+            self.busy[resource] += 1
+            case, duration = queue.popleft()
+            self._schedule(self.now + duration, STAGE_END, case)
+
+    def run(self, until):
+        """Process events strictly before until, like simpy's env.run(until)."""
+        calendar = self.calendar
+        while calendar and calendar[0][0] < until:
+            self.now, _, event, case = heapq.heappop(calendar)
+            self.events += 1
+            if event == STAGE_END:
+                self._end_stage(case)
+            elif event == SENTENCE_END:
+                self._end_sentence(case)
+            else:
+                self.start_time[case] = self.now
+                if case + 1 < self.num_cases:
+                    interarrival = self.rng.exponential(scale=self.mean_interarrival)
+                    self._schedule(self.now + interarrival, ARRIVAL, case + 1)
+                self._begin_stage(case, 0)
+        self.now = until
+
+    def save(self, path):
+        """Snapshot the whole run to a compressed .npz file.
+
+        The snapshot holds the case records, the event calendar, resource and
+        prison queues, and the state of every generator including the unread
+        part of each pre-drawn block, so a run restored with load() continues
+        exactly as this one would.
+        """
+        calendar = np.array(
+            [(time, seq, event, case) for time, seq, event, case in self.calendar],
+            dtype=[("time", "f8"), ("seq", "i8"), ("event", "i1"), ("case", "i8")],
+        )
+        header = {
+            "num_cases": self.num_cases,
+            "mean_interarrival": self.mean_interarrival,
+            "now": self.now,
+            "events": self.events,
+            "sequence": next(self._sequence),
+            "capacity": self.capacity,
+            "busy": self.busy,
+            "prison_capacity": self.prison_capacity,
+            "prison_level": self.prison_level,
+            "rng": self.rng.bit_generator.state,
+            "variates": {
+                name: {
+                    "state": buffer.rng.bit_generator.state,
+                    "spec": buffer.spec,
+                    "block_size": buffer.block_size,
+                }
+                for name, buffer in self.variates.items()
+            },
+        }
+        arrays = {
+            f"block_{name}": np.array(buffer._block[buffer._position :])
+            for name, buffer in self.variates.items()
+        }
+        for name, queue in self.queues.items():
+            waiting = np.array(queue, dtype=[("case", "i8"), ("duration", "f8")])
+            arrays[f"queue_{name}"] = waiting
+        np.savez_compressed(
+            path,
+            header=np.array(json.dumps(header)),
+            calendar=calendar,
+            prison_queue=np.array(self.prison_queue, dtype=np.int64),
+            stage=self.stage,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            stage_start=self.stage_start,
+            stage_end=self.stage_end,
+            dismissed_at=self.dismissed_at,
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Restore a run saved with save(), ready to continue with run()."""
+        with np.load(path) as snapshot:
+            header = json.loads(snapshot["header"].item())
+            system = cls.__new__(cls)
+            system.rng = _restore_generator(header["rng"])
+            system.variates = {}
+            for name, stream in header["variates"].items():
+                buffer = VariateBuffer(
+                    _restore_generator(stream["state"]),
+                    tuple(stream["spec"]),
+                    stream["block_size"],
+                )
+                buffer._block = snapshot[f"block_{name}"].tolist()
+                system.variates[name] = buffer
+            system.num_cases = header["num_cases"]
+            system.mean_interarrival = header["mean_interarrival"]
+            system.now = header["now"]
+            system.events = header["events"]
+            system.capacity = header["capacity"]
+            system.busy = header["busy"]
+            system.queues = {
+                name: deque(
+                    (int(case), float(duration))
+                    for case, duration in snapshot[f"queue_{name}"]
+                )
+                for name in system.capacity
+            }
+            system.stage_resource = [stage_resources.get(stage) for stage in stages]
+            system.prison_capacity = header["prison_capacity"]
+            system.prison_level = header["prison_level"]
+            system.prison_queue = deque(snapshot["prison_queue"].tolist())
+            for name in (
+                "stage",
+                "start_time",
+                "end_time",
+                "stage_start",
+                "stage_end",
+                "dismissed_at",
+            ):
+                setattr(system, name, snapshot[name])
+            system._sequence = count(header["sequence"])
+            # Already in heap order, so no heapify is needed
+            system.calendar = snapshot["calendar"].tolist()
+        return system
+
+    def to_frame(self):
+        """Completed cases in the same layout as CaseLog.to_frame()."""
+        done = np.flatnonzero(~np.isnan(self.end_time))
+        frame = {
+            "case_id": done,
+            "start_time": self.start_time[done],
+            "end_time": self.end_time[done],
+        }
+        for k, stage in enumerate(stages):
+            frame[f"{stage}_start"] = self.stage_start[done, k]
+            frame[f"{stage}_end"] = self.stage_end[done, k]
+            frame[f"{stage}_duration"] = frame[f"{stage}_end"] - frame[f"{stage}_start"]
+        frame = pd.DataFrame(frame)
+        frame["dismissed_at"] = pd.Categorical.from_codes(
+            self.dismissed_at[done], categories=stages
+        )
+        return frame
+
+
+def _restore_generator(state):
+    bit_generator = getattr(np.random, state["bit_generator"])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def run_heap_simulation(
+    num_cases=100, simulation_time=1000, mean_interarrival=5, seed=None, **system_kwargs
+):
+    """Heap-engine counterpart of des_simulation.run_simulation."""
+    justice_system = HeapJusticeSystem(
+        num_cases, mean_interarrival, rng=np.random.default_rng(seed), **system_kwargs
+    )
+    justice_system.run(simulation_time)
+    return justice_system
+
+
+def branch_scenarios(checkpoint, scenarios, simulation_time):
+    """Continue one saved run under each scenario of capacity changes.
+
+    scenarios maps a name to {resource: capacity} changes (resources as in
+    set_capacity) applied at the checkpoint time; an empty dict continues
+    the run unchanged. Every branch shares the warm-up up to the checkpoint
+    and its random streams, so differences between branches come from the
+    changes alone. Returns {name: HeapJusticeSystem} run to simulation_time.
+    """
+    branches = {}
+    for name, changes in scenarios.items():
+        justice_system = HeapJusticeSystem.load(checkpoint)
+        for resource, capacity in changes.items():
+            justice_system.set_capacity(resource, capacity)
+        justice_system.run(simulation_time)
+        branches[name] = justice_system
+    return branches
@@ -0,0 +1,250 @@
+"""Analytical M/G/c screening of capacity options for the DES.
+
+Each resource is treated as an M/G/c node fed by the Poisson arrivals thinned
+by the proceed probabilities: the police serve stages U and C, the courts
+stages M and Cc, and the prison holds a place for the sentence. Waits use the
+Allen-Cunneen approximation Wq = C(c, a) / (c mu - lam) * (ca^2 + cs^2) / 2
+with ca^2 = 1, and the Erlang C probability comes from the Erlang B recursion
+run over all configurations at once, so thousands of capacity combinations are
+screened in milliseconds. Only the shortlisted configurations are simulated.
+"""
+
+import argparse
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from des_simulation import (
+    NUM_CROWN_JUDGES,
+    NUM_MAGISTRATE_JUDGES,
+    NUM_POLICE,
+    PRISON_CAPACITY,
+    draw_variates,
+    probabilities,
+    processing_times,
+    stage_resources,
+    stages,
+)
+from scipy import stats
+
+# Capacity argument of JusticeSystem for each resource
+capacity_names = {
+    "police": "num_police",
+    "magistrate_court": "num_magistrate_judges",
+    "crown_court": "num_crown_judges",
+    "prison": "prison_capacity",
+}
+
+
+def service_moments(spec, minimum=None, num_samples=1000000):
+    """First and second moments of a processing_times entry, floored at minimum.
+
+    Normal specs (the stages are timed with max(1, duration)) are exact; other
+    distributions are estimated from a fixed-seed sample.
+    """
+    if isinstance(spec[0], str):
+        values = draw_variates(np.random.default_rng(0), spec, num_samples)
+        if minimum is not None:
+            values = np.maximum(minimum, values)
+        return values.mean(), np.mean(values**2)
+    mean, sd = spec
+    if minimum is None:
+        return mean, mean**2 + sd**2
+    a = (minimum - mean) / sd
+    below, density = stats.norm.cdf(a), stats.norm.pdf(a)
+    first = minimum * below + mean * (1 - below) + sd * density
+    second = (
+        minimum**2 * below
+        + (mean**2 + sd**2) * (1 - below)
+        + sd * (mean + minimum) * density
+    )
+    return first, second
+
+
+def erlang_c(servers, offered_load):
+    """Probability of waiting in an M/M/c queue, broadcast over both arguments.
+
+    The Erlang B recursion B(k) = a B(k-1) / (k + a B(k-1)) is run up to the
+    largest c and each entry keeps the value at its own c, which stays stable
+    for hundreds of servers where the factorial formula overflows.
+    """
+    servers, offered_load = np.broadcast_arrays(servers, offered_load)
+    blocking = np.ones(servers.shape)
+    result = np.ones(servers.shape)
+    for k in range(1, int(servers.max()) + 1):
+        blocking = offered_load * blocking / (k + offered_load * blocking)
+        result = np.where(servers == k, blocking, result)
+    utilization = offered_load / servers
+    with np.errstate(divide="ignore", invalid="ignore"):
+        waiting = result / (1 - utilization * (1 - result))
+    return np.where(utilization < 1, waiting, 1.0)
+
+
+def mgc_metrics(arrival_rate, mean_service, scv_service, servers):
+    """Utilization, mean wait and mean queue length of M/G/c nodes.
+
+    Unstable nodes (utilization >= 1) get infinite waits and queue lengths.
+    """
+    servers = np.asarray(servers, dtype=float)
+    offered_load = arrival_rate * mean_service
+    utilization = offered_load / servers
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wait = (
+            erlang_c(servers, offered_load)
+            / (servers / mean_service - arrival_rate)
+            * (1 + scv_service)
+            / 2
+        )
+    wait = np.where(utilization < 1, wait, np.inf)
+    return {
+        "utilization": utilization,
+        "mean_wait": wait,
+        "queue_length": arrival_rate * wait,
+    }
+
+
+def analyze_capacities(
+    num_police=NUM_POLICE,
+    num_magistrate_judges=NUM_MAGISTRATE_JUDGES,
+    num_crown_judges=NUM_CROWN_JUDGES,
+    prison_capacity=PRISON_CAPACITY,
+    mean_interarrival=5,
+):
+    """Steady-state metrics for every combination of the given capacities.
+
+    Capacities may be scalars or equal-length arrays (one configuration per
+    element). Returns a DataFrame with the capacities, utilization, mean_wait
+    and queue_length of each resource, and sojourn_time, the expected time
+    from arrival to leaving the system, dismissed or released.
+    """
+    capacities = {
+        "police": num_police,
+        "magistrate_court": num_magistrate_judges,
+        "crown_court": num_crown_judges,
+        "prison": prison_capacity,
+    }
+    capacities = dict(
+        zip(capacities, np.broadcast_arrays(*map(np.atleast_1d, capacities.values())))
+    )
+
+    # Arrival rate at each stage and the time its processing takes
+    reach = np.concatenate([[1.0], np.cumprod(probabilities)[:-1]])
+    rates = reach / mean_interarrival
+    moments = np.array(
+        [service_moments(processing_times[stage], minimum=1) for stage in stages]
+    )
+
+    frame = {capacity_names[name]: values for name, values in capacities.items()}
+    sojourn = np.zeros(len(capacities["police"]))
+    for name in capacity_names:
+        if name == "prison":
+            rate = rates[-1] * probabilities[-1]
+            mean, second = service_moments(processing_times["P"])
+        else:
+            served = [
+                k
+                for k, stage in enumerate(stages)
+                if stage_resources.get(stage) == name
+            ]
+            rate = rates[served].sum()
+            # Service time of the node is a mixture over the stages it serves
+            mean, second = rates[served] @ moments[served] / rate
+        metrics = mgc_metrics(rate, mean, second / mean**2 - 1, capacities[name])
+        for metric, values in metrics.items():
+            frame[f"{name}_{metric}"] = values
+        sojourn = sojourn + rate * mean_interarrival * metrics["mean_wait"]
+    frame["sojourn_time"] = (
+        sojourn
+        + (
+            rates @ moments[:, 0]
+            + rates[-1] * probabilities[-1] * service_moments(processing_times["P"])[0]
+        )
+        * mean_interarrival
+    )
+    return pd.DataFrame(frame)
+
+
+def capacity_grid(**ranges):
+    """Every combination of the given capacity values, as analyze_capacities kwargs."""
+    grid = np.array(list(product(*ranges.values()))).T
+    return dict(zip(ranges, grid))
+
+
+def shortlist(analysis, num_configurations=5, max_sojourn_time=None):
+    """Stable configurations with the fewest staff, then prison places, then sojourn.
+
+    With max_sojourn_time only configurations meeting that target are kept.
+    """
+    candidates = analysis[np.isfinite(analysis["sojourn_time"])]
+    if max_sojourn_time is not None:
+        candidates = candidates[candidates["sojourn_time"] <= max_sojourn_time]
+    staff = candidates[["num_police", "num_magistrate_judges", "num_crown_judges"]].sum(
+        axis=1
+    )
+    order = np.lexsort(
+        (candidates["sojourn_time"], candidates["prison_capacity"], staff)
+    )
+    return candidates.iloc[order[:num_configurations]]
+
+
+def simulate_shortlist(
+    configurations, mean_interarrival=5, num_cases=20000, replications=5, seed=0
+):
+    """Check shortlisted configurations with the DES.
+
+    Runs each through the heap engine until every case has left, and returns
+    the configurations with the simulated mean sojourn time and its standard
+    error across replications next to the analytical estimate.
+    """
+    from heap_engine import run_heap_simulation
+
+    seeds = np.random.SeedSequence(seed).spawn(len(configurations) * replications)
+    simulated = []
+    for i, (_, row) in enumerate(configurations.iterrows()):
+        capacities = {name: int(row[name]) for name in capacity_names.values()}
+        means = [
+            (cases["end_time"] - cases["start_time"]).mean()
+            for cases in (
+                run_heap_simulation(
+                    num_cases=num_cases,
+                    simulation_time=np.inf,
+                    mean_interarrival=mean_interarrival,
+                    seed=s,
+                    **capacities,
+                ).to_frame()
+                for s in seeds[i * replications : (i + 1) * replications]
+            )
+        ]
+        simulated.append((np.mean(means), stats.sem(means)))
+    simulated = np.array(simulated).reshape(-1, 2)
+    return configurations.assign(
+        simulated_sojourn_time=simulated[:, 0], simulated_sem=simulated[:, 1]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mean-interarrival", type=float, default=0.5)
+    parser.add_argument("--max-sojourn-time", type=float, default=None)
+    parser.add_argument("--shortlist", type=int, default=5)
+    args = parser.parse_args()
+
+    grid = capacity_grid(
+        num_police=range(20, 61, 2),
+        num_magistrate_judges=range(3, 21),
+        num_crown_judges=range(5, 31),
+        prison_capacity=range(20, 101, 10),
+    )
+    start = time.perf_counter()
+    analysis = analyze_capacities(**grid, mean_interarrival=args.mean_interarrival)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(analysis)} configurations in {elapsed * 1e3:.0f} ms "
+        f"({elapsed / len(analysis) * 1e6:.2f} us each)"
+    )
+    best = shortlist(analysis, args.shortlist, args.max_sojourn_time)
+    columns = list(capacity_names.values()) + ["sojourn_time"]
+    print(
+        simulate_shortlist(best[columns], args.mean_interarrival).to_string(index=False)
+    )
@@ -1,9 +1,11 @@
+import argparse
+
 import arviz as az
 import matplotlib.pyplot as plt
 import numpy as np
 import pymc as pm
-import pytensor
-from scipy.integrate import odeint
+from justice_ode import compartments
+from justice_op import JusticeSolveOp
 
 # Initial conditions for the compartments:
 I0 = 10000  # Innocent
@@ -20,68 +22,100 @@ y0 = [I0, U0, C0, Mb0, M0, Cb0, Cc0, P0]
 t = np.linspace(0, 5, 6)
 
 
-# Define the ODE system that mirrors your SD model
-def justice_system(y, t, lam):
-    I, U, C, Mb, M, Cb, Cc, P = y
-    # lam[0] is the rate at which Innocent become Under Investigation (crime rate)
-    lam0, lam1, lam2, lam3, lam4, lam5, lam6, lam7 = lam
-
-    dUdt = -lam1 * U + lam0 * I
-    dCdt = lam1 * U - lam2 * C
-    dMbdt = lam2 * C - lam3 * Mb
-    dMdt = lam3 * Mb - lam4 * M
-    dCbdt = lam4 * M - lam5 * Cb
-    dCcdt = lam5 * Cb - lam6 * Cc
-    dPdt = lam6 * Cc - lam7 * P
-    # Flow returning to Innocent: accumulates from all downstream compartments
-    dIdt = (
-        -lam0 * I + lam2 * C + lam3 * Mb + lam4 * M + lam5 * Cb + lam6 * Cc + lam7 * P
-    )
-
-    return [dIdt, dUdt, dCdt, dMbdt, dMdt, dCbdt, dCcdt, dPdt]
-
-
-with pm.Model() as model:
-    # Priors for the 8 transition rates (lam₀ to lam₇)
-    lam = pm.Lognormal("lam", mu=np.log(0.1), sigma=0.5, shape=8)
-
-    # Define a function to simulate the system given lam values
-    def simulate_justice(lam_values):
-        # Evaluate the symbolic lam values to numeric values
-        f_lam = pytensor.function([], lam_values)
-        lam_values = f_lam()
-        # Solve the ODE system over the time grid
-        solution = odeint(justice_system, y0, t, args=(lam_values,))
-        return pytensor.tensor.as_tensor_variable(solution)
-
-    # Deterministic simulation of all compartments over time
-    justice_sim = pm.Deterministic("justice_sim", simulate_justice(lam))
-
-    # Example observed data for each compartment (adjust these as needed)
-    observed_data = {
-        "I": np.array([10000, 9850, 9700, 9550, 9400, 9250]),
-        "U": np.array([5000, 4800, 4600, 4400, 4200, 4000]),
-        "C": np.array([1000, 1100, 1150, 1180, 1200, 1220]),
-        "Mb": np.array([800, 820, 850, 870, 880, 890]),
-        "M": np.array([600, 620, 630, 640, 650, 660]),
-        "Cb": np.array([400, 410, 420, 430, 440, 450]),
-        "Cc": np.array([300, 320, 340, 360, 380, 400]),
-        "P": np.array([200, 220, 240, 260, 280, 300]),
-    }
-
-    # Define a Poisson likelihood for each compartment using the simulated trajectory
-    compartments = ["I", "U", "C", "Mb", "M", "Cb", "Cc", "P"]
-    for i, comp in enumerate(compartments):
-        pm.Poisson(f"obs_{comp}", mu=justice_sim[:, i], observed=observed_data[comp])
+# Example observed data for each compartment (adjust these as needed)
+observed_data = {
+    "I": np.array([10000, 9850, 9700, 9550, 9400, 9250]),
+    "U": np.array([5000, 4800, 4600, 4400, 4200, 4000]),
+    "C": np.array([1000, 1100, 1150, 1180, 1200, 1220]),
+    "Mb": np.array([800, 820, 850, 870, 880, 890]),
+    "M": np.array([600, 620, 630, 640, 650, 660]),
+    "Cb": np.array([400, 410, 420, 430, 440, 450]),
+    "Cc": np.array([300, 320, 340, 360, 380, 400]),
+    "P": np.array([200, 220, 240, 260, 280, 300]),
+}
+
+
+def build_model(y0=y0, t=t, observed_data=observed_data):
+    """Build the PyMC model of the justice system for the given data."""
+    with pm.Model() as model:
+        # Priors for the 8 transition rates (lam₀ to lam₇)
+        lam = pm.Lognormal("lam", mu=np.log(0.1), sigma=0.5, shape=8)
+
+        # Deterministic simulation of all compartments over time, differentiable in lam
+        justice_sim = pm.Deterministic("justice_sim", JusticeSolveOp(y0, t)(lam))
+
+        # Define a Poisson likelihood for each compartment using the simulated trajectory
+        for i, comp in enumerate(compartments):
+            pm.Poisson(
+                f"obs_{comp}", mu=justice_sim[:, i], observed=observed_data[comp]
+            )
+    return model
+
+
+def run_inference(
+    model,
+    backend="nuts",
+    draws=2000,
+    tune=1000,
+    chains=2,
+    cores=2,
+    advi_iterations=5000,
+    advi_tolerance=1e-2,
+    random_seed=None,
+):
+    """Draw from the posterior of model with the chosen backend.
+
+    Every backend returns an ArviZ InferenceData with a posterior group over
+    the same variables, so downstream analysis does not depend on the choice:
+
+    - "nuts": full MCMC, the reference but slowest option
+    - "advi": mean-field variational fit, then draws from the approximation;
+      Adam steps stop once the parameters change by less than advi_tolerance
+      (relative) between checks, or after advi_iterations
+    - "smc": sequential Monte Carlo with chains run in parallel processes
+    """
+    with model:
+        if backend == "nuts":
+            return pm.sample(
+                draws,
+                tune=tune,
+                chains=chains,
+                cores=cores,
+                random_seed=random_seed,
+                return_inferencedata=True,
+            )
+        if backend == "advi":
+            convergence = pm.callbacks.CheckParametersConvergence(
+                every=100, tolerance=advi_tolerance, diff="relative"
+            )
+            approx = pm.fit(
+                n=advi_iterations,
+                method="advi",
+                obj_optimizer=pm.adam(learning_rate=0.01),
+                callbacks=[convergence],
+                random_seed=random_seed,
+            )
+            return approx.sample(draws * chains, random_seed=random_seed)
+        if backend == "smc":
+            return pm.sample_smc(
+                draws, chains=chains, cores=cores, random_seed=random_seed
+            )
+    raise ValueError(f"Unknown backend {backend!r}, expected nuts, advi or smc")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["nuts", "advi", "smc"], default="nuts")
+    args = parser.parse_args()
 
     # Sample from the posterior distribution
-    trace = pm.sample(2000, tune=1000, cores=2, return_inferencedata=True)
+    trace = run_inference(build_model(), backend=args.backend)
 
-# Posterior analysis and plotting
-az.plot_posterior(trace, var_names=["lam"])
-plt.show()
+    # Posterior analysis and plotting
+    az.plot_posterior(trace, var_names=["lam"])
+    plt.show()
 
-az.plot_trace(trace, var_names=["lam"])
-plt.show()
+    az.plot_trace(trace, var_names=["lam"])
+    plt.show()
 
-print(az.summary(trace))
+    print(az.summary(trace))
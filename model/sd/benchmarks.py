@@ -0,0 +1,273 @@
+"""Timing and consistency checks for the SD model solvers.
+
+Run from this directory, e.g. ``python benchmarks.py solver``.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from justice_ode import (
+    rate_matrix,
+    relaxation_times,
+    solve_ensemble,
+    solve_justice_system,
+    steady_state,
+)
+
+
+def _timeit(fn, n_repeat):
+    """Mean wall time of fn() in seconds over n_repeat calls."""
+    start = time.perf_counter()
+    for _ in range(n_repeat):
+        fn()
+    return (time.perf_counter() - start) / n_repeat
+
+
+def bench_solver(n_repeat=200):
+    """Compare the closed-form solvers against odeint for accuracy and speed."""
+    from deterministic_model import lam_init, t, y0
+
+    reference = solve_justice_system(y0, t, lam_init, method="odeint")
+    t_odeint = _timeit(
+        lambda: solve_justice_system(y0, t, lam_init, method="odeint"), n_repeat
+    )
+    print(f"odeint: {t_odeint * 1e6:9.1f} us/solve")
+    for method in ["expm", "eig"]:
+        solution = solve_justice_system(y0, t, lam_init, method=method)
+        # Same tolerance odeint itself is run at
+        np.testing.assert_allclose(solution, reference, rtol=1e-6, atol=1e-6)
+        elapsed = _timeit(
+            lambda: solve_justice_system(y0, t, lam_init, method=method), n_repeat
+        )
+        print(
+            f"{method:>6}: {elapsed * 1e6:9.1f} us/solve "
+            f"({t_odeint / elapsed:.1f}x vs odeint), "
+            f"max abs diff {np.max(np.abs(solution - reference)):.2e}"
+        )
+
+
+def bench_ensemble(n_sets=100000, n_reference=200, seed=0):
+    """Time solve_ensemble on n_sets random rate vectors against looped odeint."""
+    from deterministic_model import lam_init, t, y0
+
+    rng = np.random.default_rng(seed)
+    # Scatter the rates by up to a factor ~2 around the initial estimates
+    lams = np.asarray(lam_init) * rng.lognormal(0.0, 0.5, size=(n_sets, 8))
+    y0s = np.asarray(y0) * rng.uniform(0.8, 1.2, size=(n_sets, 8))
+
+    start = time.perf_counter()
+    looped = np.array(
+        [
+            solve_justice_system(y0s[i], t, lams[i], method="odeint")
+            for i in range(n_reference)
+        ]
+    )
+    t_loop = (time.perf_counter() - start) / n_reference
+    print(f"odeint loop: {t_loop * 1e6:9.1f} us/set")
+    for method in ["expm", "eig"]:
+        start = time.perf_counter()
+        solution = solve_ensemble(y0s, t, lams, method=method)
+        elapsed = (time.perf_counter() - start) / n_sets
+        np.testing.assert_allclose(solution[:n_reference], looped, rtol=1e-6, atol=1e-6)
+        print(
+            f"{method:>11}: {elapsed * 1e6:9.1f} us/set "
+            f"({t_loop / elapsed:.1f}x vs odeint loop, {n_sets} sets)"
+        )
+
+
+def bench_calibration():
+    """Compare Nelder-Mead with the gradient-based L-BFGS-B calibration."""
+    from deterministic_model import calibrate, lam_init, objective
+    from scipy.optimize import minimize
+
+    bounds = (1e-6, 10.0)
+    log_bounds = [(np.log(bounds[0]), np.log(bounds[1]))] * len(lam_init)
+    runs = {
+        # The path deterministic_model.py used to take (rates may go negative)
+        "Nelder-Mead": lambda: minimize(objective, lam_init, method="Nelder-Mead"),
+        # Same positivity constraint as calibrate(), but derivative free
+        "Nelder-Mead (log)": lambda: minimize(
+            lambda log_lam: objective(np.exp(log_lam)),
+            np.log(lam_init),
+            method="Nelder-Mead",
+            bounds=log_bounds,
+            options={"maxfev": 20000, "maxiter": 20000},
+        ),
+        "L-BFGS-B (log, analytic)": lambda: calibrate(lam_init, bounds),
+    }
+    for name, run in runs.items():
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>24}: {result.nfev:5d} evaluations, {elapsed * 1e3:8.1f} ms, "
+            f"loss {result.fun:.6g}"
+        )
+
+
+def bench_nuts(draws=1000, tune=1000, chains=2, seed=0):
+    """Check the ODE Op gradient and report effective samples per second.
+
+    NUTS (using the Op's sensitivity gradient) is compared with Metropolis,
+    the only option available when the solution cannot be differentiated.
+    """
+    import arviz as az
+    import pymc as pm
+    from bayesian_inference import build_model, t, y0
+    from justice_op import JusticeSolveOp
+    from pytensor.gradient import verify_grad
+
+    verify_grad(
+        JusticeSolveOp(y0, t),
+        [np.full(8, 0.1)],
+        rng=np.random.default_rng(seed),
+        abs_tol=1e-4,
+        rel_tol=1e-4,
+    )
+    print("JusticeSolveOp gradient matches finite differences")
+    for name, step in [("NUTS", pm.NUTS), ("Metropolis", pm.Metropolis)]:
+        with build_model():
+            start = time.perf_counter()
+            trace = pm.sample(
+                draws,
+                tune=tune,
+                chains=chains,
+                cores=1,
+                step=step(),
+                random_seed=seed,
+                progressbar=False,
+            )
+            elapsed = time.perf_counter() - start
+        ess = az.ess(trace, var_names=["lam"])["lam"].values
+        print(
+            f"{name:>10}: {elapsed:6.1f} s, min ESS {ess.min():7.1f}, "
+            f"{ess.min() / elapsed:7.2f} min-ESS/s"
+        )
+
+
+def bench_backends(draws=1000, tune=1000, chains=2, cores=2, seed=0):
+    """Compare wall time and lam posteriors of the NUTS, ADVI and SMC backends.
+
+    Agreement is measured against NUTS, in units of the NUTS posterior sd, for
+    both the posterior means and the 94% HDI bounds.
+    """
+    import arviz as az
+    from bayesian_inference import build_model, run_inference
+
+    summaries = {}
+    for backend in ["nuts", "advi", "smc"]:
+        start = time.perf_counter()
+        trace = run_inference(
+            build_model(),
+            backend=backend,
+            draws=draws,
+            tune=tune,
+            chains=chains,
+            cores=cores,
+            random_seed=seed,
+        )
+        elapsed = time.perf_counter() - start
+        summaries[backend] = (
+            az.summary(trace, var_names=["lam"], kind="stats", round_to="none"),
+            elapsed,
+        )
+
+    reference = summaries["nuts"][0]
+    for backend, (summary, elapsed) in summaries.items():
+        mean_shift = np.abs(summary["mean"] - reference["mean"]) / reference["sd"]
+        hdi_shift = (
+            np.maximum(
+                np.abs(summary["hdi_3%"] - reference["hdi_3%"]),
+                np.abs(summary["hdi_97%"] - reference["hdi_97%"]),
+            )
+            / reference["sd"]
+        )
+        print(
+            f"{backend:>5}: {elapsed:7.1f} s, max |mean shift| {mean_shift.max():.2f} sd, "
+            f"max |HDI shift| {hdi_shift.max():.2f} sd"
+        )
+        print(summary.to_string())
+
+
+def bench_incremental(draws=1000, tune=1000, warm_tune=200, seed=0):
+    """Time a cold fit on all but the last quarter against the warm-started update."""
+    import tempfile
+
+    from bayesian_inference import observed_data, t, y0
+    from incremental import run_incremental
+
+    previous_data = {comp: values[:-1] for comp, values in observed_data.items()}
+    releases = [(t[:-1], previous_data), (t, observed_data), (t, observed_data)]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for release_t, release_data in releases:
+            start = time.perf_counter()
+            trace, status = run_incremental(
+                y0,
+                release_t,
+                release_data,
+                draws=draws,
+                tune=tune,
+                warm_tune=warm_tune,
+                cores=1,
+                cache_dir=cache_dir,
+                random_seed=seed,
+            )
+            elapsed = time.perf_counter() - start
+            lam = trace.posterior["lam"].mean(dim=("chain", "draw")).values
+            print(
+                f"{len(release_t)} points, {status:>6}: {elapsed:6.1f} s, "
+                f"lam mean {np.array2string(lam, precision=4)}"
+            )
+
+
+def bench_steady_state(n_sets=1000000, n_reference=10000, seed=0):
+    """Time steady_state on n_sets rate vectors and check it against eig."""
+    from deterministic_model import lam_init
+
+    rng = np.random.default_rng(seed)
+    lams = np.asarray(lam_init) * rng.lognormal(0.0, 0.5, size=(n_sets, 8))
+
+    start = time.perf_counter()
+    growth_rate, distribution = steady_state(lams)
+    elapsed = time.perf_counter() - start
+    print(f"steady_state: {elapsed:.2f} s for {n_sets} sets")
+
+    w, V = np.linalg.eig(rate_matrix(lams[:n_reference]))
+    dominant = np.argmax(w.real, axis=1)
+    rows = np.arange(n_reference)
+    v = np.real(V[rows, :, dominant])
+    v /= v.sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(
+        growth_rate[:n_reference], w.real[rows, dominant], atol=1e-10
+    )
+    np.testing.assert_allclose(distribution[:n_reference], v, atol=1e-8)
+    print(f"matches the dominant eigenpair from eig on {n_reference} sets")
+
+    start = time.perf_counter()
+    relaxation_times(lams[:n_reference])
+    elapsed = time.perf_counter() - start
+    print(
+        f"relaxation_times: {elapsed / n_reference * 1e6:.1f} us/set "
+        f"({elapsed / n_reference * n_sets:.1f} s extrapolated to {n_sets} sets)"
+    )
+
+
+benchmarks = {
+    "solver": bench_solver,
+    "ensemble": bench_ensemble,
+    "calibration": bench_calibration,
+    "steady_state": bench_steady_state,
+    "nuts": bench_nuts,
+    "backends": bench_backends,
+    "incremental": bench_incremental,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(benchmarks)}")
+    args = parser.parse_args()
+    for name in args.names or benchmarks:
+        print(f"== {name} ==")
+        benchmarks[name]()
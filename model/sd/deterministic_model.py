@@ -1,6 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.integrate import odeint
+from justice_ode import solve_justice_system, solve_sensitivities
 from scipy.optimize import minimize
 
 # Given mean and median durations (in days) for each compartment
@@ -36,29 +36,6 @@ y0 = [
 t = np.linspace(0, 5, 6)  # Assume we have 6 time steps (e.g. weeks or months)
 
 
-# Define the ODE system
-def justice_system(y, t, lam):
-    I, U, C, Mb, M, Cb, Cc, P = y
-    lam0, lam1, lam2, lam3, lam4, lam5, lam6, lam7 = lam  # Extract transition rates
-
-    dUdt = -lam1 * U + lam0 * I
-    dCdt = lam1 * U - lam2 * C
-    dMbdt = lam2 * C - lam3 * Mb
-    dMdt = lam3 * Mb - lam4 * M
-    dCbdt = lam4 * M - lam5 * Cb
-    dCcdt = lam5 * Cb - lam6 * Cc
-    dPdt = lam6 * Cc - lam7 * P
-    dIdt = (
-        -lam0 * I + lam2 * C + lam3 * Mb + lam4 * M + lam5 * Cb + lam6 * Cc + lam7 * P
-    )  # return to innocent
-
-    return [dIdt, dUdt, dCdt, dMbdt, dMdt, dCbdt, dCcdt, dPdt]
-
-
-# Solve ODE with initial estimates
-lam_init = list(transition_rates.values())
-solution = odeint(justice_system, y0, t, args=(lam_init,))
-
 # Example observed data (replace with actual data)
 observed_data = np.array(
     [
@@ -74,39 +51,74 @@ observed_data = np.array(
 
 # Define the objective function for optimization (least squares fit)
 def objective(lam):
-    sol = odeint(justice_system, y0, t, args=(lam,))
+    sol = solve_justice_system(y0, t, lam)
     error = np.sum((sol - observed_data) ** 2)  # Sum of squared errors
     return error
 
 
-# Optimize the transition rates to best fit the observed data
-result = minimize(objective, lam_init, method="Nelder-Mead")
-
-# Best-fit transition rates
-best_fit_lam = result.x
-print("Optimized transition rates:", best_fit_lam)
-
-# Solve ODE with optimized rates
-solution_best_fit = odeint(justice_system, y0, t, args=(best_fit_lam,))
-
-# Plot results
-compartments = [
-    "Innocent" "Under Investigation",
-    "Charged",
-    "Mag. Backlog",
-    "In Mag.",
-    "Crown Backlog",
-    "In Crown",
-    "Imprisoned",
-]
-fig, ax = plt.subplots(4, 2, figsize=(12, 10))
-ax = ax.flatten()
-
-for i in range(len(compartments)):
-    ax[i].plot(t, solution_best_fit[:, i], label="Model Fit", linestyle="dashed")
-    ax[i].scatter(t, observed_data[:, i], color="red", label="Observed", marker="o")
-    ax[i].set_title(compartments[i])
-    ax[i].legend()
-
-plt.tight_layout()
-plt.show()
+# Objective and its analytic gradient with respect to the log-rates
+def log_objective_and_gradient(log_lam):
+    lam = np.exp(log_lam)
+    sol, sens = solve_sensitivities(y0, t, lam)
+    residual = sol - observed_data
+    error = np.sum(residual**2)
+    # dE/dlam_i = 2 * sum_k,j residual[k, j] * dy_j(t_k)/dlam_i, chain rule to log
+    gradient = 2 * np.einsum("kj,kji->i", residual, sens) * lam
+    return error, gradient
+
+
+# Initial estimates of the transition rates
+lam_init = list(transition_rates.values())
+
+
+def calibrate(lam0=lam_init, bounds=(1e-6, 10.0)):
+    """Fit the transition rates with L-BFGS-B on log-rates using analytic gradients.
+
+    Working on log-rates keeps every rate positive, and bounds (in rate space)
+    stop the optimizer from wandering into stiff or vanishing rates. The
+    returned result has x converted back to rates.
+    """
+    log_bounds = [(np.log(bounds[0]), np.log(bounds[1]))] * len(lam0)
+    result = minimize(
+        log_objective_and_gradient,
+        np.log(lam0),
+        jac=True,
+        method="L-BFGS-B",
+        bounds=log_bounds,
+    )
+    result.x = np.exp(result.x)
+    return result
+
+
+if __name__ == "__main__":
+    # Optimize the transition rates to best fit the observed data
+    result = calibrate(lam_init)
+
+    # Best-fit transition rates
+    best_fit_lam = result.x
+    print("Optimized transition rates:", best_fit_lam)
+
+    # Solve ODE with optimized rates
+    solution_best_fit = solve_justice_system(y0, t, best_fit_lam)
+
+    # Plot results
+    compartments = [
+        "Innocent" "Under Investigation",
+        "Charged",
+        "Mag. Backlog",
+        "In Mag.",
+        "Crown Backlog",
+        "In Crown",
+        "Imprisoned",
+    ]
+    fig, ax = plt.subplots(4, 2, figsize=(12, 10))
+    ax = ax.flatten()
+
+    for i in range(len(compartments)):
+        ax[i].plot(t, solution_best_fit[:, i], label="Model Fit", linestyle="dashed")
+        ax[i].scatter(t, observed_data[:, i], color="red", label="Observed", marker="o")
+        ax[i].set_title(compartments[i])
+        ax[i].legend()
+
+    plt.tight_layout()
+    plt.show()
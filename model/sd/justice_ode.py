@@ -0,0 +1,232 @@
+import numpy as np
+from scipy.integrate import odeint
+from scipy.linalg import expm
+
+# Compartment order used by every state vector in the SD model
+compartments = ["I", "U", "C", "Mb", "M", "Cb", "Cc", "P"]
+
+
+# Define the ODE system
+def justice_system(y, t, lam):
+    I, U, C, Mb, M, Cb, Cc, P = y
+    # lam[0] is the rate at which Innocent become Under Investigation (crime rate)
+    lam0, lam1, lam2, lam3, lam4, lam5, lam6, lam7 = lam
+
+    dUdt = -lam1 * U + lam0 * I
+    dCdt = lam1 * U - lam2 * C
+    dMbdt = lam2 * C - lam3 * Mb
+    dMdt = lam3 * Mb - lam4 * M
+    dCbdt = lam4 * M - lam5 * Cb
+    dCcdt = lam5 * Cb - lam6 * Cc
+    dPdt = lam6 * Cc - lam7 * P
+    # Flow returning to Innocent: accumulates from all downstream compartments
+    dIdt = (
+        -lam0 * I + lam2 * C + lam3 * Mb + lam4 * M + lam5 * Cb + lam6 * Cc + lam7 * P
+    )
+
+    return [dIdt, dUdt, dCdt, dMbdt, dMdt, dCbdt, dCcdt, dPdt]
+
+
+def rate_matrix(lam):
+    """Build the 8x8 matrix A(lam) such that justice_system(y, t, lam) == A @ y.
+
+    lam may carry leading batch dimensions: (..., 8) rates give (..., 8, 8) matrices.
+    """
+    lam = np.asarray(lam, dtype=float)
+    A = np.zeros(lam.shape[:-1] + (8, 8))
+    # Each compartment drains at its own rate into the next one
+    A[..., np.arange(8), np.arange(8)] = -lam
+    A[..., np.arange(1, 8), np.arange(7)] = lam[..., :7]
+    # Everything past U also flows back to Innocent
+    A[..., 0, 2:] = lam[..., 2:]
+    return A
+
+
+def solve_justice_system(y0, t, lam, method="expm"):
+    """Solve justice_system on the time grid t, returning odeint-shaped (len(t), 8).
+
+    The system is linear, so y(t) = expm(A (t - t0)) y0 and the whole grid can be
+    evaluated without a Python RHS callback:
+
+    - "expm": matrix exponentials (robust default); on a uniform grid a single
+      one-step propagator expm(A h) is computed and applied repeatedly
+    - "eig": eigendecomposition of A, cheap but inaccurate if A is near defective
+    - "odeint": the original numerical integration, kept for reference
+    """
+    if method == "odeint":
+        return odeint(justice_system, y0, t, args=(lam,))
+    A = rate_matrix(lam)
+    y0 = np.asarray(y0, dtype=float)
+    dt = np.asarray(t, dtype=float) - t[0]
+    if method == "expm":
+        steps = np.diff(dt)
+        if len(steps) and np.ptp(steps) <= 1e-10 * abs(dt[-1]):
+            propagator = expm(A * steps[0])
+            solution = np.empty((len(dt), len(y0)))
+            solution[0] = y0
+            for k in range(1, len(dt)):
+                solution[k] = propagator @ solution[k - 1]
+            return solution
+        return expm(dt[:, None, None] * A) @ y0
+    if method == "eig":
+        w, V = np.linalg.eig(A)
+        c = np.linalg.solve(V, y0)
+        return np.real((np.exp(np.outer(dt, w)) * c) @ V.T)
+    raise ValueError(f"Unknown method {method!r}, expected expm, eig or odeint")
+
+
+def solve_sensitivities(y0, t, lam):
+    """Solve justice_system together with its forward sensitivities to lam.
+
+    Returns (solution, sensitivities) with solution shaped (len(t), 8) and
+    sensitivities[k, j, i] = d y_j(t_k) / d lam_i, shaped (len(t), 8, 8).
+
+    Since A is linear in lam, each S_i = dy/dlam_i obeys the linear ODE
+    S_i' = A S_i + (dA/dlam_i) y with S_i(t0) = 0, so the state and all eight
+    sensitivities are propagated together by the matrix exponential of one
+    72x72 block matrix.
+    """
+    lam = np.asarray(lam, dtype=float)
+    A = rate_matrix(lam)
+    # rate_matrix is linear in lam, so dA/dlam_i is the matrix of the unit vector
+    dA = rate_matrix(np.eye(8))
+    M = np.kron(np.eye(9), A)
+    for i in range(8):
+        M[8 * (i + 1) : 8 * (i + 2), :8] = dA[i]
+    z = np.zeros(72)
+    z[:8] = y0
+    dt = np.asarray(t, dtype=float) - t[0]
+    steps = np.diff(dt)
+    augmented = np.empty((len(dt), 72))
+    augmented[0] = z
+    propagator = None
+    for k, h in enumerate(steps, start=1):
+        if propagator is None or not np.isclose(h, steps[k - 2]):
+            propagator = expm(M * h)
+        augmented[k] = propagator @ augmented[k - 1]
+    solution = augmented[:, :8]
+    sensitivities = augmented[:, 8:].reshape(len(dt), 8, 8).transpose(0, 2, 1)
+    return solution, sensitivities
+
+
+def iterate_ensemble(y0, t, lam):
+    """Yield the (n_sets, 8) ensemble state at each point of t in turn.
+
+    Only the current state and the batched one-step propagator are held in
+    memory, so arbitrarily long horizons can be processed as a stream.
+    """
+    lam = np.atleast_2d(np.asarray(lam, dtype=float))
+    A = rate_matrix(lam)
+    y = np.array(np.broadcast_to(np.asarray(y0, dtype=float), lam.shape))
+    steps = np.diff(np.asarray(t, dtype=float))
+    yield y
+    propagator = None
+    for k, h in enumerate(steps):
+        # Reuse the one-step propagator while the grid spacing is unchanged
+        if propagator is None or not np.isclose(h, steps[k - 1]):
+            propagator = expm(A * h)
+        y = (propagator @ y[..., None])[..., 0]
+        yield y
+
+
+def solve_ensemble(y0, t, lam, method="expm", chunk_size=10000):
+    """Solve justice_system for many parameter sets at once.
+
+    lam is an (n_sets, 8) array of transition rates and y0 either an (n_sets, 8)
+    array of initial conditions or a single (8,) vector shared by every set.
+    Returns an (n_sets, len(t), 8) trajectory tensor. Sets are processed in
+    vectorized chunks of chunk_size to bound the memory held by the batched
+    (chunk_size, 8, 8) propagators; the only Python loops are over chunks and
+    time steps, never over individual sets.
+    """
+    lam = np.atleast_2d(np.asarray(lam, dtype=float))
+    y0 = np.broadcast_to(np.asarray(y0, dtype=float), lam.shape)
+    dt = np.asarray(t, dtype=float) - t[0]
+    solution = np.empty((len(lam), len(dt), 8))
+    for lo in range(0, len(lam), chunk_size):
+        y = y0[lo : lo + chunk_size]
+        if method == "expm":
+            states = iterate_ensemble(y, t, lam[lo : lo + chunk_size])
+            for k, state in enumerate(states):
+                solution[lo : lo + chunk_size, k] = state
+        elif method == "eig":
+            A = rate_matrix(lam[lo : lo + chunk_size])
+            w, V = np.linalg.eig(A)
+            c = np.linalg.solve(V, y[..., None])[..., 0]
+            modes = np.exp(w[:, None, :] * dt[None, :, None]) * c[:, None, :]
+            solution[lo : lo + chunk_size] = np.real(
+                np.einsum("nij,ntj->nti", V, modes)
+            )
+        else:
+            raise ValueError(f"Unknown method {method!r}, expected expm or eig")
+    return solution
+
+
+def steady_state(lam, tol=1e-12, max_iter=100):
+    """Long-run growth rate and compartment distribution for each row of lam.
+
+    Returns (growth_rate, distribution) with shapes (n_sets,) and (n_sets, 8).
+    A is Metzler (non-negative off the diagonal) and irreducible, so its
+    dominant eigenvalue r is real and y(t) / sum(y(t)) tends to the positive
+    eigenvector v of r from any start. When flows conserve the population
+    (all column sums of A zero) r is 0 and v is the null space of A, i.e. the
+    stationary distribution; otherwise the population grows or decays like
+    exp(r t) with the shares still settling to v.
+
+    The chain structure gives v in closed form from r, since for k >= 1
+    v_k = lam_{k-1} v_{k-1} / (lam_k + r), and r is the unique root of the
+    remaining balance equation for I above -min(lam_1..7). That root is found
+    by Newton's method safeguarded with bisection, vectorized over all sets,
+    so no eigendecomposition is needed and millions of sets are cheap.
+    """
+    lam = np.atleast_2d(np.asarray(lam, dtype=float))
+
+    def balance(lam, r):
+        # Net flow into I per unit of I, and its derivative (negative) in r
+        inv = 1.0 / (lam[:, 1:] + r[:, None])
+        v = np.cumprod(lam[:, :-1] * inv, axis=1)
+        dv = -v * np.cumsum(inv, axis=1)
+        f = -(lam[:, 0] + r) + np.sum(lam[:, 2:] * v[:, 1:], axis=1)
+        df = -1.0 + np.sum(lam[:, 2:] * dv[:, 1:], axis=1)
+        return f, df, v
+
+    # Bracket: balance -> +inf just above -min(lam_1..7), and r is at most the
+    # largest column sum of A (column Gershgorin bound), which is max(lam_2..6)
+    lo = -lam[:, 1:].min(axis=1)
+    hi = np.maximum(lam[:, 2:7].max(axis=1), 0.0)
+    r = hi.copy()
+    # Only sets that have not converged yet are updated on each iteration
+    active = np.arange(len(lam))
+    for _ in range(max_iter):
+        f, df, _ = balance(lam[active], r[active])
+        positive = f > 0
+        lo[active] = np.where(positive, r[active], lo[active])
+        hi[active] = np.where(positive, hi[active], r[active])
+        newton = r[active] - f / df
+        inside = (newton > lo[active]) & (newton < hi[active])
+        r_next = np.where(inside, newton, 0.5 * (lo[active] + hi[active]))
+        moving = np.abs(r_next - r[active]) > tol * (1.0 + np.abs(r_next))
+        r[active] = r_next
+        active = active[moving]
+        if not len(active):
+            break
+    v = np.concatenate([np.ones((len(lam), 1)), balance(lam, r)[2]], axis=1)
+    return r, v / v.sum(axis=1, keepdims=True)
+
+
+def relaxation_times(lam, chunk_size=100000):
+    """Time scales on which each row of lam settles into its steady state.
+
+    Returns an (n_sets, 7) array, slowest first, of 1 / (r - Re(w)) over the
+    non-dominant eigenvalues w of A, where r is the dominant eigenvalue. The
+    first column is the time to equilibrium (the e-folding time of the
+    slowest transient); the imaginary parts of w, if any, make that approach
+    oscillate.
+    """
+    lam = np.atleast_2d(np.asarray(lam, dtype=float))
+    times = np.empty((len(lam), 7))
+    for lo in range(0, len(lam), chunk_size):
+        w = np.linalg.eigvals(rate_matrix(lam[lo : lo + chunk_size])).real
+        w = -np.sort(-w, axis=1)
+        times[lo : lo + chunk_size] = 1.0 / (w[:, :1] - w[:, 1:])
+    return times
@@ -0,0 +1,54 @@
+import numpy as np
+import pytensor.tensor as pt
+from justice_ode import solve_justice_system, solve_sensitivities
+from pytensor.graph.basic import Apply
+from pytensor.graph.op import Op
+
+
+class JusticeSolveOp(Op):
+    """PyTensor Op mapping the rates lam (8,) to the (len(t), 8) trajectory from y0.
+
+    The forward pass is the closed-form solve_justice_system, so the likelihood
+    depends on the sampled lam, and the gradient comes from the forward
+    sensitivities, which lets NUTS run on the model.
+    """
+
+    __props__ = ("y0", "t")
+
+    def __init__(self, y0, t):
+        # Tuples keep the Op hashable, as __props__ requires
+        self.y0 = tuple(float(v) for v in y0)
+        self.t = tuple(float(v) for v in t)
+
+    def make_node(self, lam):
+        lam = pt.as_tensor_variable(lam)
+        return Apply(self, [lam], [pt.dmatrix()])
+
+    def perform(self, node, inputs, outputs):
+        (lam,) = inputs
+        outputs[0][0] = solve_justice_system(self.y0, self.t, lam)
+
+    def grad(self, inputs, output_grads):
+        (lam,) = inputs
+        (g,) = output_grads
+        return [JusticeSolveGradOp(self.y0, self.t)(lam, g)]
+
+
+class JusticeSolveGradOp(Op):
+    """Vector-Jacobian product of JusticeSolveOp: sum_kj g[k, j] dy_j(t_k)/dlam."""
+
+    __props__ = ("y0", "t")
+
+    def __init__(self, y0, t):
+        self.y0 = y0
+        self.t = t
+
+    def make_node(self, lam, g):
+        lam = pt.as_tensor_variable(lam)
+        g = pt.as_tensor_variable(g)
+        return Apply(self, [lam, g], [pt.dvector()])
+
+    def perform(self, node, inputs, outputs):
+        lam, g = inputs
+        _, sensitivities = solve_sensitivities(self.y0, self.t, lam)
+        outputs[0][0] = np.einsum("kj,kji->i", g, sensitivities)
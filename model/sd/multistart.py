@@ -0,0 +1,114 @@
+"""Multi-start calibration of the SD model across a process pool.
+
+A single fit from lam_init easily lands in a local optimum, so this draws many
+starting points from a space-filling design over the log-rates, fits each one
+with deterministic_model.calibrate in its own process and groups the converged
+solutions.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from deterministic_model import calibrate, objective
+from scipy.stats import qmc
+
+
+def sample_starts(n_starts, bounds=(1e-4, 1.0), method="sobol", seed=0):
+    """Draw (n_starts, 8) starting rates log-uniformly from a Sobol or LHS design."""
+    if method == "sobol":
+        sampler = qmc.Sobol(d=8, seed=seed)
+    elif method == "lhs":
+        sampler = qmc.LatinHypercube(d=8, seed=seed)
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected sobol or lhs")
+    unit = sampler.random(n_starts)
+    log_lam = qmc.scale(unit, np.log(bounds[0]), np.log(bounds[1]))
+    return np.exp(log_lam)
+
+
+def fit_start(lam0):
+    """Fit one start and record its outcome and wall time (runs in a worker)."""
+    start = time.perf_counter()
+    result = calibrate(lam0)
+    return {
+        "lam0": np.asarray(lam0),
+        "lam": result.x,
+        "loss": objective(result.x),
+        "nfev": result.nfev,
+        "success": result.success,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def deduplicate(fits, rtol=1e-2, atol=1e-4):
+    """Group converged fits whose rates agree to within rtol/atol in every component.
+
+    The absolute tolerance merges rates that only differ while pinned near
+    zero, where the loss is flat and the optimizer stops anywhere.
+
+    Returns one entry per distinct solution, best first, with the number of
+    starts that reached it.
+    """
+    solutions = []
+    for fit in sorted(fits, key=lambda f: f["loss"]):
+        if not fit["success"]:
+            continue
+        for solution in solutions:
+            if np.allclose(fit["lam"], solution["lam"], rtol=rtol, atol=atol):
+                solution["count"] += 1
+                break
+        else:
+            solutions.append({"lam": fit["lam"], "loss": fit["loss"], "count": 1})
+    return solutions
+
+
+def run_multistart(n_starts=64, processes=None, method="sobol", seed=0):
+    """Fit n_starts sampled starting points in parallel and collect every fit.
+
+    Each start is an independent task, so throughput scales with the number of
+    worker processes (all cores by default).
+    """
+    starts = sample_starts(n_starts, method=method, seed=seed)
+    processes = processes or os.cpu_count()
+    # Several starts per task keeps the inter-process overhead small
+    chunksize = max(1, n_starts // (4 * processes))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(fit_start, starts, chunksize=chunksize))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--starts", type=int, default=64)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--method", choices=["sobol", "lhs"], default="sobol")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    fits = run_multistart(args.starts, args.processes, args.method, args.seed)
+    elapsed = time.perf_counter() - start
+
+    per_start = pd.DataFrame(
+        {
+            "loss": [f["loss"] for f in fits],
+            "nfev": [f["nfev"] for f in fits],
+            "success": [f["success"] for f in fits],
+            "seconds": [f["seconds"] for f in fits],
+        }
+    )
+    print(per_start.to_string())
+    print(
+        f"{len(fits)} starts in {elapsed:.2f} s wall, "
+        f"{per_start['seconds'].sum():.2f} s summed over starts"
+    )
+
+    solutions = deduplicate(fits)
+    print(f"{len(solutions)} distinct converged solutions:")
+    for solution in solutions:
+        print(f"  loss {solution['loss']:.6g} ({solution['count']} starts)")
+    if solutions:
+        print("Best-fit transition rates:", solutions[0]["lam"])
@@ -0,0 +1,62 @@
+"""Posterior predictive fan charts for the SD model.
+
+Every posterior draw of lam is propagated at once with batched matrix
+exponentials, and only quantiles across draws are kept at each time point, so
+memory stays at O(draws) however long the horizon is.
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+from justice_ode import compartments, iterate_ensemble
+
+
+def lam_draws(trace):
+    """Stack the (chain, draw) lam samples of a trace into an (n_draws, 8) array."""
+    lam = trace.posterior["lam"].stack(sample=("chain", "draw"))
+    return lam.transpose("sample", ...).values
+
+
+def predictive_quantiles(lam, y0, t, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), rng=None):
+    """Quantiles over draws of the trajectories for every row of lam.
+
+    Returns a (len(t), len(quantiles), 8) array. With an rng, Poisson
+    observation noise matching the likelihood is added to each draw, giving
+    predictive rather than mean-trajectory quantiles.
+    """
+    out = np.empty((len(t), len(quantiles), 8))
+    for k, state in enumerate(iterate_ensemble(y0, t, lam)):
+        if rng is not None:
+            state = rng.poisson(state)
+        out[k] = np.quantile(state, quantiles, axis=0)
+    return out
+
+
+def plot_fan_chart(t, bands, t_observed=None, observed_data=None):
+    """Plot the 5-95% and 25-75% bands and median from the default quantiles."""
+    fig, ax = plt.subplots(4, 2, figsize=(12, 10))
+    ax = ax.flatten()
+    for i, comp in enumerate(compartments):
+        ax[i].fill_between(t, bands[:, 0, i], bands[:, 4, i], alpha=0.2, label="90%")
+        ax[i].fill_between(t, bands[:, 1, i], bands[:, 3, i], alpha=0.4, label="50%")
+        ax[i].plot(t, bands[:, 2, i], label="Median")
+        if observed_data is not None:
+            ax[i].scatter(
+                t_observed, observed_data[comp], color="red", label="Observed"
+            )
+        ax[i].set_title(comp)
+        ax[i].legend()
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    from bayesian_inference import observed_data, t, y0
+    from incremental import run_incremental
+
+    trace, _ = run_incremental()
+    # Project well past the observed window on the same time unit
+    horizon = np.linspace(0, 60, 121)
+    bands = predictive_quantiles(
+        lam_draws(trace), y0, horizon, rng=np.random.default_rng(0)
+    )
+    plot_fan_chart(horizon, bands, t, observed_data)